@@ -0,0 +1,83 @@
+#!/usr/bin/python
+"""End-to-end crawl benchmark over a synthetic documentation tree.
+
+Times ScriptReferenceReader.read() and save(), in total and per stage, with logging disabled, and reports the peak RSS
+after each of them. --stream writes the classes to a JSON Lines file while reading, as crawl.py --stream does.
+The tree is generated by gen_synthetic_docs.py, into a temporary directory unless --dir is given.
+--read-latency adds a delay to every page read, as on a network share.
+"""
+import os
+import sys
+import time
+import shutil
+import resource
+import logging
+import tempfile
+import argparse
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from crawl import ScriptReferenceReader, COMPACT_EXTENSION, logger
+from prefetcher import Prefetcher
+import page_reader
+from crawl_stats import stats
+from gen_synthetic_docs import SyntheticDocs, DEFAULT_NUM_CLASSES
+
+def getPeakRss():
+	# megabytes; ru_maxrss is in kilobytes on Linux, and worker processes are not included
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+def main():
+	parser = argparse.ArgumentParser(description='Benchmarks a crawl of a synthetic Unity documentation tree.')
+	parser.add_argument('--classes', type=int, default=DEFAULT_NUM_CLASSES, help='number of classes to generate (default: %(default)s)')
+	parser.add_argument('--dir', help='documentation directory, generated if it does not exist (default: a temporary directory)')
+	parser.add_argument('--workers', type=int, default=1, help='number of processes reading class pages (default: %(default)s)')
+	parser.add_argument('--prefetch', type=int, default=0, metavar='THREADS', help='number of threads reading pages ahead (default: off)')
+	parser.add_argument('--stream', action='store_true', help='write classes to a JSON Lines file as they are read')
+	parser.add_argument('--read-latency', type=float, default=0, metavar='MS', help='delay added to every page read (default: %(default)s)')
+	parser.add_argument('--stats-json', metavar='FILE', help='write the stats to a JSON file')
+	args = parser.parse_args()
+
+	logger.setLevel(logging.WARNING)
+	logger.addHandler(logging.NullHandler())
+
+	tempDir = tempfile.mkdtemp(prefix='unity-docs-')
+	baseDir = args.dir or os.path.join(tempDir, 'docs')
+	try:
+		if not os.path.isdir(baseDir):
+			start = time.time()
+			SyntheticDocs(baseDir, numClasses=args.classes).generate()
+			print 'generated {} classes in {:.2f} s: {}'.format(args.classes, time.time() - start, baseDir)
+
+		if args.read_latency:
+			readFile = page_reader.readFile
+			def readFileSlowly(filename):
+				time.sleep(args.read_latency / 1000.)
+				return readFile(filename)
+			page_reader.readFile = readFileSlowly
+
+		outputFilename = os.path.join(tempDir, 'unity.pkl')
+		prefetcher = Prefetcher(args.prefetch) if args.prefetch else None
+		streamFilename = os.path.join(tempDir, 'unity.jsonl') if args.stream else None
+		reader = ScriptReferenceReader(baseDir=baseDir, workers=args.workers, prefetcher=prefetcher, streamFilename=streamFilename)
+		stats.reset()
+		with stats.timer('total'):
+			reader.read()
+			readPeakRss = getPeakRss()
+			reader.save(outputFilename, compactFilename=os.path.splitext(outputFilename)[0] + COMPACT_EXTENSION)
+
+		if prefetcher:
+			prefetcher.close()
+		numClasses = len(reader.classLinks)
+		totalSeconds = stats.timers['total'][1]
+		print '{} classes, {} workers: {:.2f} s, {:.0f} classes/s'.format(numClasses, args.workers, totalSeconds, numClasses / totalSeconds)
+		print 'peak RSS: {:.1f} MB after read(), {:.1f} MB after save()'.format(readPeakRss, getPeakRss())
+		print
+		print stats.formatTable()
+		if args.stats_json:
+			stats.saveJson(args.stats_json)
+	finally:
+		shutil.rmtree(tempDir)
+
+if __name__ == '__main__':
+	main()
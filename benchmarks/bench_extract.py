@@ -0,0 +1,96 @@
+#!/usr/bin/python
+"""Benchmark of page reading and parsing.
+
+Reads and parses every page of a documentation tree with the previous full-DOM path
+(parse the whole page, find the content section) and with page_reader (parse of the content section only),
+and checks that both yield the same content. Also times page_reader with memory-mapped reads.
+The tree is generated by gen_synthetic_docs.py, into a temporary directory unless --dir is given.
+"""
+import os
+import sys
+import time
+import mmap
+import glob
+import shutil
+import tempfile
+import argparse
+from lxml import html
+from lxml import etree
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from page_reader import readContent, extractContent, parseContent, PageContent, CONTENT_SECTION_XPATH
+from gen_synthetic_docs import SyntheticDocs
+
+DEFAULT_NUM_CLASSES = 300
+NUM_ROUNDS = 3
+
+# the implementation replaced by page_reader, kept for comparison
+def readContentFullDom(filename):
+	page = html.fromstring(open(filename, 'r').read())
+	return CONTENT_SECTION_XPATH(page)[0]
+
+def readContentTargeted(filename):
+	return parseContent(readContent(filename))
+
+def readContentMapped(filename):
+	with open(filename, 'rb') as f:
+		data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		try:
+			content = extractContent(data)
+			# the parser only takes strings, so the section, or the page, is copied out of the map
+			if content.start is not None:
+				content = PageContent(data[content.start:], 0)
+			else:
+				content = PageContent(data[:], None)
+		finally:
+			data.close()
+	return parseContent(content)
+
+def getContentSize(content):
+	# bytes parsed
+	return len(content.data) - (content.start or 0)
+
+def timeReader(read, filenames):
+	best = None
+	for _i in xrange(NUM_ROUNDS):
+		start = time.time()
+		for filename in filenames:
+			read(filename)
+		elapsed = time.time() - start
+		best = elapsed if best is None else min(best, elapsed)
+	return best
+
+def main():
+	parser = argparse.ArgumentParser(description='Benchmarks reading and parsing documentation pages.')
+	parser.add_argument('--classes', type=int, default=DEFAULT_NUM_CLASSES, help='number of classes to generate (default: %(default)s)')
+	parser.add_argument('--dir', help='documentation directory, generated if it does not exist (default: a temporary directory)')
+	args = parser.parse_args()
+
+	tempDir = tempfile.mkdtemp(prefix='unity-docs-')
+	baseDir = args.dir or os.path.join(tempDir, 'docs')
+	try:
+		if not os.path.isdir(baseDir):
+			SyntheticDocs(baseDir, numClasses=args.classes).generate()
+		filenames = sorted(glob.glob(os.path.join(baseDir, 'ScriptReference', '*.html')))
+		for filename in filenames:
+			expected = etree.tostring(readContentFullDom(filename), with_tail=False)
+			actual = etree.tostring(readContentTargeted(filename), with_tail=False)
+			assert expected == actual, filename
+
+		totalBytes = sum(os.path.getsize(filename) for filename in filenames)
+		contentBytes = sum(getContentSize(readContent(filename)) for filename in filenames)
+		fullDom = timeReader(readContentFullDom, filenames)
+		targeted = timeReader(readContentTargeted, filenames)
+		mapped = timeReader(readContentMapped, filenames)
+		print '{} pages, {:.1f} MB, content sections {:.1f} MB, best of {} rounds'.format(
+			len(filenames), totalBytes / 1048576., contentBytes / 1048576., NUM_ROUNDS)
+		print 'full DOM:  {:.1f} us/page'.format(fullDom / len(filenames) * 1e6)
+		print 'targeted:  {:.1f} us/page'.format(targeted / len(filenames) * 1e6)
+		print 'speedup:   {:.2f}x'.format(fullDom / targeted)
+		print 'targeted, memory-mapped: {:.1f} us/page'.format(mapped / len(filenames) * 1e6)
+	finally:
+		shutil.rmtree(tempDir)
+
+if __name__ == '__main__':
+	main()
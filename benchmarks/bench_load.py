@@ -0,0 +1,105 @@
+#!/usr/bin/python
+"""Benchmark of editor plugin start-up: loading the pickle against loading the completion table.
+
+Each load is timed in a fresh interpreter, as when an editor starts, and the median of the runs is reported.
+The files are in the OS page cache after the first run, so reads from disk are not included.
+The completion table is written from the pickle into a temporary directory, along with a copy of the pickle
+with plain strings, as written by the current crawler (the included unity.pkl holds a few lxml strings, which import lxml).
+--python times the loads with another interpreter, e.g. Python 3 as used by Sublime Text 3 plugins.
+"""
+import os
+import sys
+import time
+import pickle
+import shutil
+import tempfile
+import argparse
+import subprocess
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from completion_export import CompletionExportWriter
+
+DEFAULT_PICKLE = os.path.join(ROOT_DIR, 'unity.pkl')
+DEFAULT_NUM_RUNS = 15
+
+# run in the child interpreter, prints the seconds taken by the load
+LOADERS = [
+	('pickle.load', '''
+import pickle
+start = time.time()
+with open(PICKLE, 'rb') as f:
+	data = pickle.load(f) if sys.version_info[0] == 2 else pickle.load(f, encoding='utf-8')
+'''),
+	('pickle.load, plain strings', '''
+import pickle
+start = time.time()
+with open(PLAIN_PICKLE, 'rb') as f:
+	data = pickle.load(f) if sys.version_info[0] == 2 else pickle.load(f, encoding='utf-8')
+'''),
+	('completion table, open', '''
+from completion_export import CompletionExport
+start = time.time()
+export = CompletionExport(COMPLETIONS)
+'''),
+	('completion table, every class', '''
+from completion_export import CompletionExport
+start = time.time()
+export = CompletionExport(COMPLETIONS)
+export.getClassCompletions()
+for className in set(line.split(u'\\t', 1)[0] for line in export.classes):
+	export.getMemberCompletions(className)
+'''),
+]
+CHILD_HEADER = 'import sys, time\nsys.path.insert(0, {!r})\nPICKLE = {!r}\nPLAIN_PICKLE = {!r}\nCOMPLETIONS = {!r}\n'
+CHILD_FOOTER = '\nprint(time.time() - start)\n'
+
+def timeLoader(python, code, numRuns):
+	# returns None if the load fails, e.g. for lack of lxml
+	times = []
+	for _i in xrange(numRuns):
+		try:
+			times.append(float(subprocess.check_output([python, '-c', code], stderr=open(os.devnull, 'w'))))
+		except subprocess.CalledProcessError:
+			return None
+	return sorted(times)[len(times) // 2]
+
+def plainCopy(obj):
+	if isinstance(obj, dict):
+		return dict((plainCopy(key), plainCopy(value)) for key, value in obj.iteritems())
+	elif isinstance(obj, list):
+		return [plainCopy(item) for item in obj]
+	elif isinstance(obj, str):
+		return str(obj)
+	elif isinstance(obj, unicode):
+		return unicode(obj)
+	return obj
+
+def main():
+	parser = argparse.ArgumentParser(description='Benchmarks loading the crawled data in a fresh interpreter.')
+	parser.add_argument('--pickle', default=DEFAULT_PICKLE, help='pickle written by crawl.py (default: %(default)s)')
+	parser.add_argument('--python', default=sys.executable, help='interpreter to time the loads with (default: this one)')
+	parser.add_argument('--runs', type=int, default=DEFAULT_NUM_RUNS, help='number of runs of each load (default: %(default)s)')
+	args = parser.parse_args()
+
+	tempDir = tempfile.mkdtemp(prefix='unity-load-')
+	try:
+		completionsFilename = os.path.join(tempDir, 'unity.completions')
+		plainPickleFilename = os.path.join(tempDir, 'unity.pkl')
+		classDataBySection = pickle.load(open(args.pickle, 'rb'))
+		pickle.dump(plainCopy(classDataBySection), open(plainPickleFilename, 'wb'), pickle.HIGHEST_PROTOCOL)
+		start = time.time()
+		CompletionExportWriter().write(completionsFilename, classDataBySection)
+		print 'completion table written in {:.2f} s'.format(time.time() - start)
+		print 'pickle {:.2f} MB, completion table {:.2f} MB'.format(
+			os.path.getsize(args.pickle) / 1048576., os.path.getsize(completionsFilename) / 1048576.)
+		header = CHILD_HEADER.format(os.path.abspath(ROOT_DIR), os.path.abspath(args.pickle), plainPickleFilename, completionsFilename)
+		print 'median of {} runs with {}:'.format(args.runs, args.python)
+		for name, code in LOADERS:
+			seconds = timeLoader(args.python, header + code + CHILD_FOOTER, args.runs)
+			print '{:32}{}'.format(name + ':', '{:8.1f} ms'.format(seconds * 1000) if seconds is not None else '  failed')
+	finally:
+		shutil.rmtree(tempDir)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,61 @@
+#!/usr/bin/python
+"""Memory benchmark of the function definition model.
+
+Rebuilds the signatures of all functions in unity.pkl and parses them into dicts, as the crawler used to,
+and into func_model records, comparing their in-memory size.
+Also compares the size of the pickle written with and without shared definitions (crawl.py --share-records).
+"""
+import os
+import sys
+import gc
+import pickle
+import logging
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from crawl import ScriptReferenceReader, logger
+from func_model import membersFromDicts
+from bench_parse import iterSignatures, parseFuncDefPerName, DATA_FILENAME
+
+def deepSize(obj, seen=None):
+	# counts each object once, like the interpreter stores it
+	if seen is None:
+		seen = set()
+	if id(obj) in seen:
+		return 0
+	seen.add(id(obj))
+	size = sys.getsizeof(obj)
+	if isinstance(obj, dict):
+		size += sum(deepSize(key, seen) + deepSize(value, seen) for key, value in obj.iteritems())
+	elif isinstance(obj, (list, tuple)):
+		size += sum(deepSize(item, seen) for item in obj)
+	elif hasattr(obj, '__slots__'):
+		size += sum(deepSize(getattr(obj, name), seen) for name in obj.__slots__)
+	return size
+
+def main():
+	logger.setLevel(logging.WARNING)
+	logger.addHandler(logging.NullHandler())
+	classDataBySection = pickle.load(open(DATA_FILENAME, 'rb'))
+	signatures = list(iterSignatures(classDataBySection))
+	gc.collect()
+
+	dicts = [parseFuncDefPerName(funcDef, funcName) for funcDef, funcName in signatures]
+	records = [ScriptReferenceReader.parseFuncDef(funcDef, funcName) for funcDef, funcName in signatures]
+	dictsSize = deepSize(dicts)
+	recordsSize = deepSize(records)
+	print '{} function definitions, {} parameters'.format(len(records), sum(len(funcDef.params) for funcDef in records))
+	print 'dicts:   {:8.0f} KB, {:.0f} bytes/definition'.format(dictsSize / 1024., float(dictsSize) / len(dicts))
+	print 'records: {:8.0f} KB, {:.0f} bytes/definition'.format(recordsSize / 1024., float(recordsSize) / len(records))
+	print 'ratio:   {:8.2f}x'.format(float(dictsSize) / recordsSize)
+	print
+
+	model = dict((sectionName, dict((className, membersFromDicts(members)) for className, members in classData.iteritems()))
+		for sectionName, classData in classDataBySection.iteritems())
+	unsharedSize = len(pickle.dumps(ScriptReferenceReader.canonicalize(model), pickle.HIGHEST_PROTOCOL))
+	sharedSize = len(pickle.dumps(ScriptReferenceReader.canonicalize(model, records={}), pickle.HIGHEST_PROTOCOL))
+	print 'pickle, unshared definitions: {:8.0f} KB'.format(unsharedSize / 1024.)
+	print 'pickle, shared definitions:   {:8.0f} KB'.format(sharedSize / 1024.)
+
+if __name__ == '__main__':
+	main()
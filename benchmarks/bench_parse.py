@@ -0,0 +1,98 @@
+#!/usr/bin/python
+"""Micro-benchmark of function definition parsing.
+
+Rebuilds the signatures of all functions in unity.pkl and parses each of them
+with the previous per-name regular expressions and with ScriptReferenceReader.parseFuncDef.
+"""
+import os
+import sys
+import re
+import time
+import pickle
+import logging
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from crawl import ScriptReferenceReader, logger
+
+DATA_FILENAME = os.path.join(ROOT_DIR, 'unity.pkl')
+NUM_ROUNDS = 5
+
+def iterSignatures(classDataBySection):
+	for classData in classDataBySection.itervalues():
+		for members in classData.itervalues():
+			for funcName, funcDefs in members.iteritems():
+				for funcDef in funcDefs or []:
+					yield formatSignature(funcName, funcDef), funcName
+
+def formatSignature(funcName, funcDef):
+	params = []
+	for param in funcDef['params']:
+		text = param['type']
+		if param['name']:
+			text += ' ' + param['name']
+			if param['default']:
+				text += ' = ' + param['default']
+		params.append(text)
+	signature = 'public {}{}({})'.format(funcName, funcDef['template'] or '', ', '.join(params))
+	if funcDef['returnType'] == ';':
+		return signature + ';'
+	return signature + ' : ' + (funcDef['returnType'] or '')
+
+# the implementation replaced by the precompiled one, kept for comparison
+def parseFuncDefPerName(funcDef, funcName):
+	logger.debug('        def: ' + funcDef)
+	m = re.search(r'%s(\.?<\S+>)?\s*\(\s*([^)]*)\s*\)\s*:?\s*(\S+)?' % re.escape(funcName), funcDef)
+	if not m:
+		raise Exception('Function definition structure does not match: ' + funcDef)
+	template = m.group(1)
+	params = re.findall(r'[^,<\[]+(?:\<[^>]*\>)?(?:\[[^\]]*\])?[^,]*', m.group(2))
+	if params == ['']: params = []
+	params = map(str.strip, params)
+	params = map(parseParamPerCall, params)
+	returnType = m.group(3)
+	logger.info('           template: ' + str(template))
+	logger.info('           params: ' + str(params))
+	logger.info('           returnType: ' + str(returnType))
+	return {
+		'template': template,
+		'params': params,
+		'returnType': returnType
+	}
+
+def parseParamPerCall(param):
+	m = re.search(r'^((?:(?:out|ref|params) )?[\w\.,<>\[\]]+)(?:\s+(\w+)(?:\s*=\s*([\w\-\.\"]+))?)?$', param)
+	if not m:
+		raise Exception('Could not parse function param: ' + param)
+	return {
+		'name': m.group(2),
+		'type': m.group(1),
+		'default': m.group(3)
+	}
+
+def timeParser(parse, signatures):
+	best = None
+	for _i in xrange(NUM_ROUNDS):
+		start = time.time()
+		for funcDef, funcName in signatures:
+			parse(funcDef, funcName)
+		elapsed = time.time() - start
+		best = elapsed if best is None else min(best, elapsed)
+	return best
+
+def main():
+	logger.setLevel(logging.WARNING)
+	logger.addHandler(logging.NullHandler())
+	signatures = list(iterSignatures(pickle.load(open(DATA_FILENAME, 'rb'))))
+	for funcDef, funcName in signatures:
+		assert parseFuncDefPerName(funcDef, funcName) == ScriptReferenceReader.parseFuncDef(funcDef, funcName).toDict(), funcDef
+
+	perName = timeParser(parseFuncDefPerName, signatures)
+	precompiled = timeParser(ScriptReferenceReader.parseFuncDef, signatures)
+	print '{} function definitions, best of {} rounds'.format(len(signatures), NUM_ROUNDS)
+	print 'per-name patterns: {:.2f} us/definition'.format(perName / len(signatures) * 1e6)
+	print 'precompiled:       {:.2f} us/definition'.format(precompiled / len(signatures) * 1e6)
+	print 'speedup:           {:.2f}x'.format(perName / precompiled)
+
+if __name__ == '__main__':
+	main()
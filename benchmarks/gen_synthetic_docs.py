@@ -0,0 +1,205 @@
+#!/usr/bin/python
+"""Generates a synthetic Unity ScriptReference tree, for benchmarking the crawler without a Unity installation.
+
+The tree has a docdata/toc.json in the shape ScriptReferenceReader.traverseClassList expects,
+and class and member pages with the structures the crawler reads: signature blocks,
+Parameters tables, generic descriptions, example code, pages without signatures and inherited members.
+Generation is deterministic for a given number of classes and seed.
+"""
+import os
+import json
+import random
+import argparse
+
+DEFAULT_NUM_CLASSES = 1000
+DEFAULT_SEED = 1
+
+NAMESPACES = [
+	# namespace, sub-namespaces, share of classes
+	('UnityEngine', ['UnityEngine.AI', 'UnityEngine.UI', 'UnityEngine.Rendering'], 0.6),
+	('UnityEditor', ['UnityEditor.Animations', 'UnityEditor.SceneManagement'], 0.35),
+	('Other', [], 0.05)
+]
+CATEGORIES = [('Classes', 0.75), ('Interfaces', 0.05), ('Enumerations', 0.15), ('Attributes', 0.05)]
+# the crawler only expects classes and enumerations outside of UnityEngine and UnityEditor
+OTHER_CATEGORIES = [('Classes', 0.8), ('Enumerations', 0.2)]
+TYPES = ['float', 'int', 'bool', 'string', 'Vector2', 'Vector3', 'Quaternion', 'Color', 'GameObject', 'Transform',
+	'Object', 'Rect', 'Matrix4x4', 'Texture2D', 'Material', 'Mesh', 'Camera', 'float[]', 'List<int>', 'Action<bool>']
+DEFAULTS = {'float': '0.0f', 'int': '0', 'bool': 'false', 'string': '""'}
+SHARED_MESSAGES = ['Awake', 'Start', 'Update', 'OnEnable', 'OnDisable', 'OnDestroy']
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Unity - Scripting API: {title}</title>
+<link rel="stylesheet" href="../StaticFiles/css/core.css"><script src="../StaticFiles/js/core.js"></script></head>
+<body>
+<div class="header-wrapper"><div id="header" class="header"><div class="content"><div class="spacer"><div class="menu">
+<div class="logo"><a href="../index.html"></a></div><div class="search-form"><form action="30_search.html" method="get">
+<input type="text" name="q" placeholder="Search scripting..."><input type="submit"></form></div>
+<ul><li><a href="../Manual/index.html">Manual</a></li><li><a href="index.html" class="selected">Scripting API</a></li></ul>
+</div></div></div></div></div>
+<div id="master-wrapper" class="master-wrapper clear">
+<div id="sidebar" class="sidebar"><div class="sidebar-wrap"><div class="content"><div class="sidebar-menu"><div class="toc"><h2>Scripting API</h2>
+{nav}
+</div></div></div></div></div>
+<div id="content-wrap" class="content-wrap opened-sidebar"><div class="content-block"><div class="content"><div class="section">
+{content}
+</div></div></div>
+<div class="footer-wrapper"><div class="footer clear"><div class="copy">Copyright 2019 Unity Technologies.</div>
+<div class="menu"><a href="https://unity3d.com/company/legal/terms-of-service">Legal</a></div></div></div>
+</div></div>
+</body>
+</html>
+'''
+
+class SyntheticDocs(object):
+	def __init__(self, baseDir, numClasses=DEFAULT_NUM_CLASSES, seed=DEFAULT_SEED):
+		self.baseDir = baseDir
+		self.refDir = os.path.join(baseDir, 'ScriptReference')
+		self.numClasses = numClasses
+		self.random = random.Random(seed)
+		self.nav = self.makeNav()
+
+	def makeNav(self):
+		items = ''.join('<li><a href="Class{0}.html">Class{0}</a></li>'.format(i) for i in xrange(40))
+		return '<ul>{}</ul>'.format(items)
+
+	def choose(self, weightedItems):
+		value = self.random.random()
+		for item, weight in weightedItems:
+			value -= weight
+			if value <= 0:
+				return item
+		return weightedItems[-1][0]
+
+	def writePage(self, filename, title, content):
+		with open(os.path.join(self.refDir, filename), 'w') as f:
+			f.write(PAGE_TEMPLATE.format(title=title, nav=self.nav, content=content))
+
+	def generate(self):
+		os.makedirs(os.path.join(self.refDir, 'docdata'))
+		for message in SHARED_MESSAGES:
+			self.writeMemberPage('MonoBehaviour.{}.html'.format(message), 'MonoBehaviour', message, [('void', [])])
+
+		# namespace -> sub-namespace (or None) -> category -> class toc entries
+		tocByNamespace = dict((namespace, {}) for namespace, _subNamespaces, _share in NAMESPACES)
+		namespaceWeights = [((namespace, subNamespaces), share) for namespace, subNamespaces, share in NAMESPACES]
+		for i in xrange(self.numClasses):
+			namespace, subNamespaces = self.choose(namespaceWeights)
+			subNamespace = self.random.choice(subNamespaces + [None, None]) if subNamespaces else None
+			category = self.choose(OTHER_CATEGORIES if namespace == 'Other' else CATEGORIES)
+			className = 'Class{}'.format(i)
+			if category == 'Enumerations':
+				self.writeEnumPage(className)
+			else:
+				self.writeClassPage(className, category)
+			entries = tocByNamespace[namespace].setdefault(subNamespace, {}).setdefault(category, [])
+			entries.append({'link': className, 'title': className, 'children': None})
+
+		toc = {'link': 'toc', 'title': 'Scripting API', 'children': [
+			{'link': 'null', 'title': namespace, 'children': self.makeNamespaceToc(tocByNamespace[namespace])}
+			for namespace, _subNamespaces, _share in NAMESPACES
+		] + [{'link': 'null', 'title': 'Assemblies', 'children': [{'link': 'null', 'title': 'UnityEngine.dll', 'children': None}]}]}
+		with open(os.path.join(self.refDir, 'docdata', 'toc.json'), 'w') as f:
+			json.dump(toc, f)
+
+	@classmethod
+	def makeNamespaceToc(cls, entriesBySubNamespace):
+		children = cls.makeCategoriesToc(entriesBySubNamespace.get(None, {}))
+		for subNamespace in sorted(name for name in entriesBySubNamespace if name):
+			children.append({'link': 'null', 'title': subNamespace, 'children': cls.makeCategoriesToc(entriesBySubNamespace[subNamespace])})
+		return children
+
+	@classmethod
+	def makeCategoriesToc(cls, entriesByCategory):
+		return [{'link': 'null', 'title': category, 'children': entriesByCategory[category]}
+			for category, _share in CATEGORIES if category in entriesByCategory]
+
+	def writeEnumPage(self, className):
+		rows = [('Value{}'.format(j), None) for j in xrange(self.random.randint(2, 12))]
+		self.writePage(className + '.html', className, self.makeHeader(className) + self.makeSubsection('Properties', className, rows))
+
+	def writeClassPage(self, className, category):
+		content = self.makeHeader(className)
+		if category == 'Attributes':
+			sections = [('Constructors', 1)]
+		else:
+			sections = [('Properties', self.random.randint(0, 12)), ('Static Properties', self.random.randint(0, 3)),
+				('Constructors', self.random.randint(0, 2)), ('Public Methods', self.random.randint(0, 10)),
+				('Static Methods', self.random.randint(0, 5)), ('Messages', self.random.randint(0, 3))]
+		for sectionName, numMembers in sections:
+			rows = []
+			for j in xrange(numMembers):
+				if sectionName in ('Properties', 'Static Properties'):
+					rows.append(('{}{}'.format('property' if sectionName == 'Properties' else 'staticProperty', j), None))
+				elif sectionName == 'Messages':
+					message = SHARED_MESSAGES[j]
+					rows.append((message, 'MonoBehaviour.{}.html'.format(message)))
+				else:
+					funcName = className if sectionName == 'Constructors' else 'Method{}{}'.format('Static' if sectionName == 'Static Methods' else '', j)
+					url = '{}-ctor{}.html'.format(className, j) if sectionName == 'Constructors' else '{}.{}.html'.format(className, funcName)
+					self.writeMemberPage(url, className, funcName, self.makeOverloads(), sectionName == 'Constructors')
+					rows.append((funcName, url))
+			if rows:
+				content += self.makeSubsection(sectionName, className, rows)
+		if category == 'Classes':
+			content += '<div class="subsection"><h2>Inherited Members</h2>{}</div>'.format(
+				self.makeSubsection('Properties', 'Object', [('name', None), ('hideFlags', None)]))
+		self.writePage(className + '.html', className, content)
+
+	@classmethod
+	def makeHeader(cls, className):
+		return '<div class="mb20 clear"><h1 class="heading inherit">{}</h1><div class="clear"></div></div>'.format(className)
+
+	@classmethod
+	def makeSubsection(cls, sectionName, className, rows):
+		tableRows = ''.join('<tr><td class="lbl"><a href="{}">{}</a></td><td class="desc">Description of {}.</td></tr>'.format(
+			url or '{}-{}.html'.format(className, name), name, name) for name, url in rows)
+		return '<div class="subsection"><h2>{}</h2><table class="list">{}</table></div>'.format(sectionName, tableRows)
+
+	def makeOverloads(self):
+		overloads = []
+		for _i in xrange(self.random.choice([1, 1, 1, 2, 2, 3])):
+			params = []
+			for k in xrange(self.random.randint(0, 4)):
+				type_ = self.random.choice(TYPES)
+				default = DEFAULTS.get(type_) if k > 0 and self.random.random() < 0.2 else None
+				params.append((type_, 'param{}'.format(k), default))
+			overloads.append((self.random.choice(TYPES + ['void'] * 5), params))
+		return overloads
+
+	def writeMemberPage(self, url, className, funcName, overloads, isConstructor=False):
+		content = '<div class="mb20 clear"><h1 class="heading inherit">{}.{}</h1></div>'.format(className, funcName)
+		if self.random.random() < 0.03:
+			# some pages have no signature, only the header
+			self.writePage(url, funcName, content + '<div class="subsection"><h2>Description</h2><p>Undocumented.</p></div>')
+			return
+		for returnType, params in overloads:
+			paramsText = ', '.join('{} {}{}'.format(type_, name, ' = ' + default if default else '') for type_, name, default in params)
+			prefix = 'public' if isConstructor else 'public {}'.format(returnType)
+			content += '<div class="subsection"><div class="signature"><div class="signature-CS sig-block">{} <span class="sig-kw">{}</span>({});</div></div></div>'.format(prefix, funcName, paramsText)
+			if params and self.random.random() < 0.8:
+				rows = ''.join('<tr><td class="name lbl">{}</td><td class="desc">The {}.</td></tr>'.format(name, name) for _type, name, _default in params)
+				content += '<div class="subsection"><h2>Parameters</h2><table class="list">{}</table></div>'.format(rows)
+			description = 'Generic version.' if self.random.random() < 0.05 else 'Does something with {}.'.format(funcName)
+			content += '<div class="subsection"><h2>Returns</h2><p><b>{}</b> The result.</p></div>'.format(returnType)
+			content += '<div class="subsection"><h2>Description</h2><p>{}</p></div>'.format(description)
+		if self.random.random() < 0.5:
+			returnType, params = overloads[0]
+			paramsText = ', '.join('{} {}'.format(type_, name) for type_, name, _default in params)
+			content += ('<div class="subsection"><pre class="codeExampleRaw">using UnityEngine;\n\npublic class ExampleClass : MonoBehaviour\n{{\n'
+				'    {} {}({})\n    {{\n        Debug.Log("{}");\n    }}\n}}\n</pre></div>').format(returnType, funcName, paramsText, funcName)
+		self.writePage(url, funcName, content)
+
+def main():
+	parser = argparse.ArgumentParser(description='Generates a synthetic Unity documentation tree.')
+	parser.add_argument('baseDir', help='output directory (the equivalent of BASE_DIR), must not exist')
+	parser.add_argument('--classes', type=int, default=DEFAULT_NUM_CLASSES, help='number of classes (default: %(default)s)')
+	parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='random seed (default: %(default)s)')
+	args = parser.parse_args()
+	if os.path.exists(args.baseDir):
+		parser.error('directory exists: {}'.format(args.baseDir))
+	SyntheticDocs(args.baseDir, numClasses=args.classes, seed=args.seed).generate()
+
+if __name__ == '__main__':
+	main()
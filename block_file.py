@@ -0,0 +1,36 @@
+"""Text files of sorted blocks of lines, the format of the search index and the completion table.
+
+A file is UTF-8 text. The first line holds a magic string and the number of lines in each block.
+The blocks follow one another, each made of sorted, unique, tab-separated lines, so that readers can bisect them
+and loading a file only reads and splits it.
+
+The readers of the crawler's output (this module, search_index, completion_export, compact_format and content_hash)
+are meant to be used by editor plugins too, so they work with both Python 2 and 3.
+"""
+import io
+
+def joinFields(*fields):
+	return u'\t'.join(field if isinstance(field, type(u'')) else field.decode('utf-8') for field in fields)
+
+def writeBlocks(filename, magic, blocks):
+	"""Writes blocks given as iterables of lines, which are sorted and deduplicated."""
+	blocks = [sorted(set(lines)) for lines in blocks]
+	with io.open(filename, 'w', encoding='utf-8', newline='\n') as f:
+		f.write(joinFields(magic, *[str(len(lines)) for lines in blocks]) + u'\n')
+		for lines in blocks:
+			for line in lines:
+				f.write(line + u'\n')
+
+def readBlocks(filename, magic, description):
+	"""Returns the blocks of a file as lists of lines; description names the kind of file in errors."""
+	with io.open(filename, 'r', encoding='utf-8', newline='\n') as f:
+		lines = f.read().split(u'\n')
+	header = lines[0].split(u'\t')
+	if header[0] != magic:
+		raise Exception('Not a Unity reference {}: {}'.format(description, filename))
+	blocks = []
+	start = 1
+	for count in header[1:]:
+		blocks.append(lines[start:start + int(count)])
+		start += int(count)
+	return blocks
@@ -0,0 +1,17 @@
+"""Pickling that yields the same bytes for equal data, so that the output of two crawls of the same documentation is identical.
+
+The protocol is pinned, rather than the highest one of the running Python, and dictionary items are written
+in sorted key order, rather than in hash table order, which depends on insertion history and on hash randomization (python -R).
+Loading is unchanged: the files are read with pickle.load.
+"""
+import pickle
+
+PICKLE_PROTOCOL = 2
+
+class CanonicalPickler(pickle.Pickler):
+	def _batch_setitems(self, items):
+		pickle.Pickler._batch_setitems(self, iter(sorted(items)))
+
+def dump(obj, filename):
+	with open(filename, 'wb') as f:
+		CanonicalPickler(f, PICKLE_PROTOCOL).dump(obj)
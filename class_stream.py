@@ -0,0 +1,67 @@
+"""Class data written as JSON Lines while crawling, one record per class.
+
+Each line is a JSON object with the keys "section", "class", "link" and "members",
+and with --incremental "manifest", the class's manifest entry apart from its data (see Manifest.getStreamRecord),
+so that a resumed crawl records the classes written before in the manifest too.
+Lines are flushed as they are written, so a crawl that dies keeps every class written before that,
+and a resumed crawl skips them.
+"""
+import os
+import json
+
+class ClassStreamWriter(object):
+	def __init__(self, filename, resume=False):
+		self.filename = filename
+		# links of the classes already in the file
+		self.writtenLinks = set()
+		if resume and os.path.isfile(filename):
+			self.truncatePartialLine()
+			for record in iterClassStream(filename):
+				self.writtenLinks.add(record['link'])
+			self.file = open(filename, 'ab')
+		else:
+			self.file = open(filename, 'wb')
+
+	def truncatePartialLine(self):
+		# a crawl that died while writing may have left an incomplete last line
+		with open(self.filename, 'r+b') as f:
+			data = f.read()
+			if data and not data.endswith('\n'):
+				f.truncate(data.rfind('\n') + 1)
+
+	def write(self, classLink, classData, manifestRecord=None):
+		record = {
+			'section': classLink.sectionName,
+			'class': classLink.name,
+			'link': classLink.link,
+			'members': classData
+		}
+		if manifestRecord is not None:
+			record['manifest'] = manifestRecord
+		self.file.write(json.dumps(record, sort_keys=True, separators=(',', ':')) + '\n')
+		self.file.flush()
+		self.writtenLinks.add(classLink.link)
+
+	def close(self):
+		self.file.close()
+
+def iterClassStream(filename):
+	with open(filename, 'rb') as f:
+		for line in f:
+			if line.endswith('\n'):
+				yield decodeStrings(json.loads(line))
+
+def decodeStrings(obj):
+	# json returns unicode strings, while lxml returns str for ASCII text;
+	# convert back so that the output does not depend on the way it was built
+	if isinstance(obj, dict):
+		return dict((decodeStrings(key), decodeStrings(value)) for key, value in obj.iteritems())
+	elif isinstance(obj, list):
+		return [decodeStrings(item) for item in obj]
+	elif isinstance(obj, unicode):
+		try:
+			return obj.encode('ascii')
+		except UnicodeEncodeError:
+			return obj
+	else:
+		return obj
@@ -0,0 +1,138 @@
+"""Compact, indexed storage of the crawled data, from which single classes are loaded on demand.
+
+File layout:
+
+* Magic (8 bytes)
+* Header: offsets and lengths of the strings table and of the class index (4 little-endian uint32)
+* Class records, one per class
+* Strings table: JSON array of all strings, where index 0 stands for None
+* Class index: JSON object, {section: {class name: [record offset, record length]}}
+
+A class record is a JSON array of members, each [member name, definitions],
+where definitions are null (for variables) or a list of [template, return type, params]
+and params is a flat list of name, type, default triplets.
+All strings in records are indexes into the strings table.
+"""
+import json
+import struct
+
+MAGIC = b'USCOMP01'
+HEADER_FORMAT = '<IIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+class CompactWriter(object):
+	def __init__(self):
+		self.strings = [None]
+		self.stringIndexes = {None: 0}
+
+	def getStringIndex(self, value):
+		index = self.stringIndexes.get(value)
+		if index is None:
+			index = len(self.strings)
+			self.strings.append(value)
+			self.stringIndexes[value] = index
+		return index
+
+	def encodeClass(self, classData):
+		record = []
+		for memberName in sorted(classData):
+			funcDefs = classData[memberName]
+			if funcDefs is not None:
+				funcDefs = [self.encodeFuncDef(funcDef) for funcDef in funcDefs]
+			record.append([self.getStringIndex(memberName), funcDefs])
+		return record
+
+	def encodeFuncDef(self, funcDef):
+		params = []
+		for param in funcDef['params']:
+			params.extend((self.getStringIndex(param['name']), self.getStringIndex(param['type']), self.getStringIndex(param['default'])))
+		return [self.getStringIndex(funcDef['template']), self.getStringIndex(funcDef['returnType']), params]
+
+	def write(self, filename, classDataBySection):
+		with open(filename, 'wb') as f:
+			f.write(MAGIC)
+			f.write(b'\0' * HEADER_SIZE)
+			index = {}
+			for sectionName in sorted(classDataBySection):
+				sectionIndex = index[sectionName] = {}
+				for className in sorted(classDataBySection[sectionName]):
+					record = self.encodeJson(self.encodeClass(classDataBySection[sectionName][className]))
+					sectionIndex[className] = [f.tell(), len(record)]
+					f.write(record)
+			stringsOffset = f.tell()
+			strings = self.encodeJson(self.strings)
+			f.write(strings)
+			indexOffset = f.tell()
+			indexJson = self.encodeJson(index)
+			f.write(indexJson)
+			f.seek(len(MAGIC))
+			f.write(struct.pack(HEADER_FORMAT, stringsOffset, len(strings), indexOffset, len(indexJson)))
+
+	@classmethod
+	def encodeJson(cls, obj):
+		return json.dumps(obj, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+class CompactReader(object):
+	"""Loads the class index when opened, and the strings table when the first class is loaded."""
+
+	def __init__(self, filename):
+		self.file = open(filename, 'rb')
+		if self.file.read(len(MAGIC)) != MAGIC:
+			raise Exception('Not a compact Unity reference file: {}'.format(filename))
+		self.stringsOffset, self.stringsLength, indexOffset, indexLength = struct.unpack(HEADER_FORMAT, self.file.read(HEADER_SIZE))
+		self.index = self.readJson(indexOffset, indexLength)
+		self.strings = None
+
+	def close(self):
+		self.file.close()
+
+	def readJson(self, offset, length):
+		self.file.seek(offset)
+		return json.loads(self.file.read(length).decode('utf-8'))
+
+	def getSectionNames(self):
+		return sorted(self.index)
+
+	def getClassNames(self, sectionName=None):
+		if sectionName is not None:
+			return sorted(self.index[sectionName])
+		return sorted(set(className for sectionIndex in self.index.values() for className in sectionIndex))
+
+	def findSection(self, className):
+		for sectionName in self.getSectionNames():
+			if className in self.index[sectionName]:
+				return sectionName
+		return None
+
+	def loadClass(self, className, sectionName=None):
+		"""Returns the members of a class, in the same format as in the pickle, or None if not found."""
+		if sectionName is None:
+			sectionName = self.findSection(className)
+		location = self.index.get(sectionName, {}).get(className)
+		if location is None:
+			return None
+		if self.strings is None:
+			self.strings = self.readJson(self.stringsOffset, self.stringsLength)
+		return self.decodeClass(self.readJson(*location))
+
+	def decodeClass(self, record):
+		strings = self.strings
+		classData = {}
+		for memberNameIndex, funcDefs in record:
+			if funcDefs is not None:
+				funcDefs = [self.decodeFuncDef(funcDef) for funcDef in funcDefs]
+			classData[strings[memberNameIndex]] = funcDefs
+		return classData
+
+	def decodeFuncDef(self, funcDef):
+		strings = self.strings
+		templateIndex, returnTypeIndex, params = funcDef
+		return {
+			'template': strings[templateIndex],
+			'params': [{
+				'name': strings[params[i]],
+				'type': strings[params[i + 1]],
+				'default': strings[params[i + 2]]
+			} for i in range(0, len(params), 3)],
+			'returnType': strings[returnTypeIndex]
+		}
@@ -0,0 +1,108 @@
+"""Completion table for editor plugins, with the completions precomputed, so that loading it only reads and splits the file.
+
+The table is a block file (see block_file) with two blocks:
+
+* Classes: class name, section
+* Members: class name, trigger, hint, contents
+
+A member's trigger is its signature as shown in the completion list (e.g. "Rotate(Vector3 eulers, Space relativeTo = Space.Self)"),
+the hint is its return type or class name, and the contents is a Sublime Text snippet, with a placeholder for each
+parameter (e.g. "Rotate(${1:Vector3 eulers}${2:, ${3:Space relativeTo}})"). Parameters with a default value
+get a nested placeholder, including the comma, so that they can be removed at once.
+Functions get a line per definition, variables a single line.
+"""
+import bisect
+from block_file import joinFields, writeBlocks, readBlocks
+from search_index import iterWithDeclaredTypes, getReturnType
+
+MAGIC = 'USCMP1'
+# characters with a meaning in snippets
+SNIPPET_ESCAPES = (('\\', '\\\\'), ('$', '\\$'), ('}', '\\}'))
+
+class CompletionExportWriter(object):
+	def write(self, filename, classDataBySection, declaredTypes=None):
+		"""declaredTypes gives the return types of C# signatures, see search_index.SearchIndexWriter.write()."""
+		classes = []
+		members = []
+		for sectionName, classData in classDataBySection.items():
+			for className, classMembers in classData.items():
+				classes.append(joinFields(className, sectionName))
+				for memberName, funcDefs in classMembers.items():
+					if funcDefs is None:
+						members.append(joinFields(className, memberName, className, memberName))
+						continue
+					for funcDef, declaredType in iterWithDeclaredTypes(funcDefs, declaredTypes, sectionName, className, memberName):
+						members.append(joinFields(className, self.formatTrigger(memberName, funcDef),
+							getReturnType(funcDef, declaredType) or className, self.formatSnippet(memberName, funcDef)))
+		writeBlocks(filename, MAGIC, (classes, members))
+
+	@classmethod
+	def formatParam(cls, param):
+		return param['type'] + ' ' + param['name'] if param['name'] else param['type']
+
+	# %-formatting rather than str.format, since names may be str or unicode in Python 2
+	@classmethod
+	def formatTrigger(cls, memberName, funcDef):
+		params = []
+		for param in funcDef['params']:
+			text = cls.formatParam(param)
+			params.append(text + ' = ' + param['default'] if param['default'] is not None else text)
+		return '%s%s(%s)' % (memberName, funcDef['template'] or '', ', '.join(params))
+
+	@classmethod
+	def formatSnippet(cls, memberName, funcDef):
+		snippet = [cls.escapeSnippet(memberName)]
+		placeholder = 1
+		template = funcDef['template']
+		if template:
+			# one placeholder per type parameter, e.g. ".<T>" -> ".<${1:T}>"
+			prefix, _sep, typeParams = template.partition('<')
+			typeParamPlaceholders = []
+			for typeParam in typeParams.rstrip('>').split(','):
+				typeParamPlaceholders.append('${%d:%s}' % (placeholder, cls.escapeSnippet(typeParam.strip())))
+				placeholder += 1
+			snippet.append('%s<%s>' % (prefix, ', '.join(typeParamPlaceholders)))
+		snippet.append('(')
+		for i, param in enumerate(funcDef['params']):
+			separator = ', ' if i else ''
+			text = cls.escapeSnippet(cls.formatParam(param))
+			if param['default'] is None:
+				snippet.append('%s${%d:%s}' % (separator, placeholder, text))
+				placeholder += 1
+			else:
+				snippet.append('${%d:%s${%d:%s}}' % (placeholder, separator, placeholder + 1, text))
+				placeholder += 2
+		snippet.append(')')
+		return ''.join(snippet)
+
+	@classmethod
+	def escapeSnippet(cls, text):
+		for char, escaped in SNIPPET_ESCAPES:
+			text = text.replace(char, escaped)
+		return text
+
+class CompletionExport(object):
+	"""Completion lists are built when first asked for, so opening the table costs one read and one split."""
+
+	def __init__(self, filename):
+		self.classes, self.members = readBlocks(filename, MAGIC, 'completion table')
+
+	def getClassCompletions(self):
+		"""Returns [trigger, contents] pairs of all classes, with the section as the hint."""
+		completions = []
+		for line in self.classes:
+			className, sectionName = line.split(u'\t')
+			completions.append([className + u'\t' + sectionName, className])
+		return completions
+
+	def getMemberCompletions(self, className):
+		"""Returns [trigger, contents] pairs of a class's members, ready to be returned by a Sublime Text plugin."""
+		completions = []
+		prefix = className + u'\t'
+		for i in range(bisect.bisect_left(self.members, prefix), len(self.members)):
+			line = self.members[i]
+			if not line.startswith(prefix):
+				break
+			trigger, hint, contents = line[len(prefix):].split(u'\t')
+			completions.append([trigger + u'\t' + hint, contents])
+		return completions
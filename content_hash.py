@@ -0,0 +1,60 @@
+"""Content hashes of the crawled data, to tell whether a crawl changed anything, and which classes.
+
+The hashes are a JSON file with the keys:
+
+* "version" - Version of the hashing scheme, changed whenever hashes of the same data would change
+* "dataset" - Hash of the whole dataset
+* "classes" - Dictionary by section, then by class name, of class hashes
+
+A class's hash is the SHA-1 of its members in canonical JSON (sorted keys, no whitespace), so it only depends on the content,
+not on the pickle protocol, dictionary order or string types. The dataset's hash is that of the "classes" dictionary, in the same way.
+"""
+import json
+import hashlib
+
+HASH_VERSION = 1
+
+def hashCanonical(obj):
+	return hashlib.sha1(json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+class ContentHashes(object):
+	def __init__(self, datasetHash, classHashes):
+		self.datasetHash = datasetHash
+		# section -> class name -> hash
+		self.classHashes = classHashes
+
+	@classmethod
+	def compute(cls, classDataBySection):
+		"""Hashes data in the pickle's format."""
+		classHashes = {}
+		for sectionName, classData in classDataBySection.items():
+			classHashes[sectionName] = dict((className, hashCanonical(members)) for className, members in classData.items())
+		return cls(hashCanonical(classHashes), classHashes)
+
+	@classmethod
+	def load(cls, filename):
+		with open(filename, 'rb') as f:
+			hashes = json.loads(f.read().decode('utf-8'))
+		if hashes.get('version') != HASH_VERSION:
+			# hashed differently, so every class counts as changed
+			return cls(None, {})
+		return cls(hashes['dataset'], hashes['classes'])
+
+	def save(self, filename):
+		with open(filename, 'wb') as f:
+			f.write(json.dumps({'version': HASH_VERSION, 'dataset': self.datasetHash, 'classes': self.classHashes},
+				sort_keys=True, indent=0, separators=(',', ':')).encode('utf-8'))
+
+	def getClassHash(self, className, sectionName):
+		return self.classHashes.get(sectionName, {}).get(className)
+
+	def getChangedClasses(self, other):
+		"""Returns the (section, class name) tuples of the classes added, removed or changed since other, sorted."""
+		changed = set()
+		for hashes, otherHashes in ((self.classHashes, other.classHashes), (other.classHashes, self.classHashes)):
+			for sectionName, classHashes in hashes.items():
+				otherClassHashes = otherHashes.get(sectionName, {})
+				for className, classHash in classHashes.items():
+					if otherClassHashes.get(className) != classHash:
+						changed.add((sectionName, className))
+		return sorted(changed)
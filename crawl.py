@@ -1,14 +1,47 @@
 #!/usr/bin/python
 import os
-from lxml import html
-# from lxml import etree
+from lxml import etree
 import re
 import json
 from itertools import izip
-import pickle
+import argparse
+import multiprocessing
+import cProfile
+import pstats
+import atexit
+import Queue
+import time
+import socket
+import traceback
+from page_cache import PageCache
+from prefetcher import Prefetcher, URGENT
+from page_reader import readContent, parseContent
+from manifest import Manifest
+from compact_format import CompactWriter
+from search_index import SearchIndexWriter, RETURN_TYPE_RE
+from completion_export import CompletionExportWriter
+from content_hash import ContentHashes
+import canonical_pickle
+from class_stream import ClassStreamWriter, iterClassStream
+from multi_version import VersionedDataset
+from work_queue import WorkQueue, FAILED
+from fixups import Fixups
+from func_model import FuncDef, Param, internString, membersToDicts, membersFromDicts
+from crawl_stats import stats
+from log_queue import QueueHandler, QueueListener
 
 OUTPUT_FILENAME = 'unity.pkl'
 LOG_FILENAME = 'crawl.log'
+# workers are often started in the coordinator's directory, so each writes its own log
+WORKER_LOG_FILENAME = 'crawl-worker-{}.log'
+MANIFEST_SUFFIX = '.manifest'
+COMPACT_EXTENSION = '.compact'
+SEARCH_INDEX_EXTENSION = '.search'
+COMPLETIONS_EXTENSION = '.completions'
+HASHES_EXTENSION = '.hashes'
+STREAM_FILENAME = 'unity.jsonl'
+VERSIONS_FILENAME = 'unity_versions.pkl'
+PROFILE_NUM_LINES = 30
 EXCLUDE_INHERITED = True
 
 BASE_DIR = '/Applications/Unity/Hub/Editor/2019.2.16f1/Documentation/en'
@@ -19,24 +52,49 @@ VARIABLES_SECTIONS = set(['Properties', 'Static Properties'])
 MESSAGES_SECTIONS = set(['Messages', 'Delegates', 'Events'])
 FUNCTIONS_SECTIONS = set(['Constructors', 'Public Methods', 'Static Methods', 'Protected Methods', 'Operators'])
 
-with open(LOG_FILENAME, 'w'): pass
+# number of class links handed to a worker process at a time
+POOL_CHUNK_SIZE = 4
+# number of upcoming class pages read ahead when prefetching
+PREFETCH_CLASSES = 8
+# seconds between checks of the work queue, and between progress reports of the coordinator
+QUEUE_POLL_INTERVAL = 0.2
+PROGRESS_INTERVAL = 10
+
 import logging
 # create logger
 logger = logging.getLogger('unity_crawl_application')
 logger.setLevel(logging.DEBUG)
-# create file handler
-fh = logging.FileHandler(LOG_FILENAME)
-fh.setLevel(logging.DEBUG)
-# create console handler
-ch = logging.StreamHandler()
-ch.setLevel(logging.DEBUG)
-# create formatter and add it to the handlers
-formatter = logging.Formatter('%(asctime)s - %(levelname)s: %(message)s')
-fh.setFormatter(formatter)
-ch.setFormatter(formatter)
-# add the handlers to the logger
-logger.addHandler(fh)
-logger.addHandler(ch)
+# logger of the per-section and per-member lines, which make up most of the log
+memberLogger = logging.getLogger('unity_crawl_application.members')
+
+def setupLogging(quiet=False, background=False, truncate=True, filename=LOG_FILENAME):
+	if truncate:
+		with open(filename, 'w'): pass
+	# create file handler
+	fh = logging.FileHandler(filename)
+	fh.setLevel(logging.DEBUG)
+	# create console handler
+	ch = logging.StreamHandler()
+	ch.setLevel(logging.DEBUG)
+	# create formatter and add it to the handlers
+	formatter = logging.Formatter('%(asctime)s - %(levelname)s: %(message)s')
+	fh.setFormatter(formatter)
+	ch.setFormatter(formatter)
+	# add the handlers to the logger
+	for handler in list(logger.handlers):
+		logger.removeHandler(handler)
+	if background:
+		# formatting and writing happen on a background thread
+		queueHandler = QueueHandler(Queue.Queue())
+		listener = QueueListener(queueHandler.queue, fh, ch)
+		listener.start()
+		atexit.register(listener.stop)
+		logger.addHandler(queueHandler)
+	else:
+		logger.addHandler(fh)
+		logger.addHandler(ch)
+	# in quiet mode per-member lines are filtered out before being formatted, and each class gets a summary line instead
+	memberLogger.setLevel(logging.WARNING if quiet else logging.NOTSET)
 
 ### Class sections:
 # Variables
@@ -71,16 +129,43 @@ class ScriptReferenceReader(object):
 	CLASS_LIST_JSON_FILE = 'ScriptReference/docdata/toc.json'
 	REFERENCE_DIR = 'ScriptReference'
 
-	BUG_WORKAROUNDS = {
-		'Media.MediaState': 'WindowsPhone.Media.MediaState',
-		'Packer.Execution': 'Sprites.Packer.Execution',
-		'Asset.States': 'VersionControl.Asset.States',
-		'Message.Severity': 'VersionControl.Message.Severity'
-	}
-
-	UNDOCUMENTED = [
-		['Runtime Classes', 'GameObject', 'FindGameObjectWithTag', 'public static GameObject[] FindGameObjectWithTag(string tag);']
-	]
+	# XPath expressions, compiled once
+	SUBSECTIONS_XPATH = etree.XPath('./div[@class="subsection"]')
+	SUBSECTION_TITLE_XPATH = etree.XPath('./h2')
+	SUBSECTION_TABLE_XPATH = etree.XPath('./table[@class="list"]')
+	MEMBER_LINKS_XPATH = etree.XPath('.//td[@class="lbl"]/a')
+	# relative to the content section, see page_reader
+	SIGNATURES_XPATH = etree.XPath('.//div[@class="signature-CS sig-block"]')
+	PAGE_TITLES_XPATH = etree.XPath('.//h1')
+	DESCRIPTION_TITLE_XPATH = etree.XPath('./parent::div/parent::div[@class="subsection"]/following-sibling::div[@class="subsection"]/h2[text()="Description"]')
+	FOLLOWING_PARAGRAPHS_XPATH = etree.XPath('./following-sibling::p')
+	FUNC_DEF_SECT_XPATH = etree.XPath('./parent::div/parent::div[@class="subsection"]')
+	HEADER_SECT_XPATH = etree.XPath('./parent::div[contains(@class, "mb20")]')
+	PARAMS_TITLE_XPATH = etree.XPath('./following-sibling::div[@class="subsection"]/h2[text()="Parameters"]')
+	FOLLOWING_TABLES_XPATH = etree.XPath('./following-sibling::table')
+	PARAM_NAMES_XPATH = etree.XPath('.//td[@class="name lbl"]/text()', smart_strings=False)
+	EXAMPLES_XPATH = etree.XPath('./following-sibling::div[@class="subsection"]/pre[@class="codeExampleJS" or @class="codeExampleRaw"]')
+
+	# Regular expressions, compiled once.
+	# Function definitions are matched by finding the function name and then matching what follows it,
+	# so no pattern has to be built per function name.
+	#                                   .<temp>?     (   params     )   : returnType
+	FUNC_DEF_TAIL_RE = re.compile(r'(\.?<\S+>)?\s*\(\s*([^)]*)\s*\)\s*:?\s*(\S+)?')
+	# split by commas but ignore: "[,,,,]"
+	# allow commas inside <> and inside []
+	FUNC_PARAMS_RE = re.compile(r'[^,<\[]+(?:\<[^>]*\>)?(?:\[[^\]]*\])?[^,]*')
+	PARAM_RE = re.compile(r'^((?:(?:out|ref|params) )?[\w\.,<>\[\]]+)(?:\s+(\w+)(?:\s*=\s*([\w\-\.\"]+))?)?$')
+	# an example function definition, following the function name: (params) up to the opening brace
+	EXAMPLE_FUNC_DEF_TAIL_RE = re.compile(r'\s*\(.+?(?=\s*\{)')
+	# a name followed by an opening parenthesis, candidates for function definitions in examples
+	EXAMPLE_CALL_RE = re.compile(r'\b(\w+)\s*\(')
+	NAME_RE = re.compile(r'^\w+$')
+	WORD_CHAR_RE = re.compile(r'\w')
+	# the type preceding the function name, e.g. "public static GameObject[] Find(string name);"
+	LEADING_RETURN_TYPE_RE = re.compile(r'([\w\.]+(?:<[^<>]*>)?(?:\[[,\s]*\])*)\s+$')
+	MODIFIERS = set(['public', 'protected', 'private', 'internal', 'static', 'virtual', 'override', 'abstract', 'sealed',
+		'extern', 'unsafe', 'new', 'delegate', 'event', 'implicit', 'explicit', 'operator'])
+	HEADER_QUALIFIER_RE = re.compile(r'.+\.')
 
 	class ClassLink:
 		def __init__(self, name, category, link, namespace):
@@ -92,7 +177,7 @@ class ScriptReferenceReader(object):
 
 		@property
 		def sectionName(self):
-			logger.debug('class info: namespace={} category={}'.format(self.namespace, self.category))
+			logger.debug('class info: namespace=%s category=%s', self.namespace, self.category)
 			if self.namespace == 'UnityEngine' or self.namespace == 'Unity':
 				namespace = 'Runtime'
 			elif self.namespace == 'UnityEditor':
@@ -102,15 +187,33 @@ class ScriptReferenceReader(object):
 			else:
 				raise Exception('Unknown namespace: {}'.format(self.namespace))
 			sectionName = namespace + ' ' + self.category
-			logger.debug('sectionName: {}'.format(sectionName))
+			logger.debug('sectionName: %s', sectionName)
 
 			if sectionName not in OUTPUT_SECTIONS:
 				raise Exception('Insanity detected, unexpected section name: {}'.format(sectionName))
 
 			return sectionName
 
-	def __init__(self, baseDir):
+	def __init__(self, baseDir, workers=1, manifestFilename=None, streamFilename=None, resume=False, manifest=None, pageCache=None, prefetcher=None, fixups=None,
+			workQueue=None):
 		self.baseDir = baseDir
+		self.workers = workers
+		# classes are read by worker processes on any host through this queue, if given (see runWorker)
+		self.workQueue = workQueue
+		self.manifestFilename = manifestFilename
+		self.streamFilename = streamFilename
+		self.resume = resume
+		# loaded from manifestFilename, if given
+		self.manifest = manifest
+		# reads pages on background threads, if given
+		self.prefetcher = prefetcher
+		self.pageCache = pageCache or PageCache(prefetcher=prefetcher)
+		# workarounds for bugs in the documentation
+		self.fixups = fixups or Fixups.load()
+		# names of the classes read or reused (rather than resumed), for reporting unmatched fix-ups
+		self.classesRead = set()
+		# filenames of the pages read by the current readClass call
+		self.pagesRead = set()
 		self.classLinks = None
 		self.classDataBySection = None
 		self.classListFile = os.path.join(self.baseDir, self.CLASS_LIST_JSON_FILE)
@@ -118,15 +221,20 @@ class ScriptReferenceReader(object):
 
 	def read(self):
 		self.readClassList()
-		self.readAllPages()
+		if self.streamFilename:
+			self.streamAllPages()
+			self.readStream()
+		else:
+			self.readAllPages()
 		self.addUndocumented()
+		self.reportUnmatchedFixups()
 
 	def readClassList(self):
 		self.classLinks = []
 		self.classDataBySection = dict([(sectionName, {}) for sectionName in OUTPUT_SECTIONS])
 		classList = self.readClassListJson()
 		self.traverseClassList(classList)
-		logger.info('# classes={}'.format(len(self.classLinks)))
+		logger.info('# classes=%d', len(self.classLinks))
 
 	def readClassListJson(self):
 		classListJson = open(self.classListFile, 'r').read()
@@ -137,10 +245,7 @@ class ScriptReferenceReader(object):
 		if obj['title'] == 'Assemblies':
 			return # skip Assemblies submenu
 		if obj['link'] != 'null' and obj['link'] != 'toc':
-			if obj['link'] in self.BUG_WORKAROUNDS:
-				link = self.BUG_WORKAROUNDS[obj['link']]
-			else:
-				link = obj['link']
+			link = self.fixups.fixClassLink(obj['link'])
 			self.classLinks.append(self.ClassLink(name=obj['title'], category=hierarchy[-1], link=link, namespace=hierarchy[1]))
 		if obj['children']:
 			hierarchy.append(obj['title'])
@@ -149,23 +254,187 @@ class ScriptReferenceReader(object):
 			hierarchy.pop()
 
 	def readAllPages(self):
-		for classLink in self.classLinks:
-			classData = self.readClass(classLink)
+		for classLink, classData in self.iterAllClassData(self.classLinks):
 			self.classDataBySection[classLink.sectionName][classLink.name] = classData
 
+	def streamAllPages(self):
+		# classes are written as they are read, so that an interrupted crawl can be resumed (see readStream for memory use)
+		writer = ClassStreamWriter(self.streamFilename, resume=self.resume)
+		classLinks = [classLink for classLink in self.classLinks if classLink.link not in writer.writtenLinks]
+		resumedLinks = set(writer.writtenLinks)
+		if self.resume:
+			logger.info('resume: %d classes already written', len(self.classLinks) - len(classLinks))
+		try:
+			for classLink, classData in self.iterAllClassData(classLinks, resumedLinks):
+				writer.write(classLink, membersToDicts(classData), self.manifest.getStreamRecord(classLink) if self.manifest else None)
+		finally:
+			writer.close()
+
+	def readStream(self):
+		# records are converted as they are read, so only one is held apart from the class data;
+		# all of the class data is held, as the output files are written from classDataBySection
+		classLinksByLink = {}
+		for classLink in self.classLinks:
+			classLinksByLink.setdefault(classLink.link, []).append(classLink)
+		for record in iterClassStream(self.streamFilename):
+			for classLink in classLinksByLink.pop(record['link'], []):
+				self.classDataBySection[classLink.sectionName][classLink.name] = membersFromDicts(record['members'])
+		if classLinksByLink:
+			raise Exception('{} classes missing from {}, e.g. {}'.format(len(classLinksByLink), self.streamFilename, classLinksByLink.keys()[0]))
+
+	def iterAllClassData(self, classLinks, resumedLinks=()):
+		# resumedLinks are those of the classes written to the class stream by an interrupted crawl
+		if self.manifestFilename:
+			self.manifest = Manifest.load(self.manifestFilename, self.refDir)
+		# results arrive in class list order, regardless of the number of workers
+		for classLink, classData in self.iterClassData(classLinks):
+			yield classLink, classData
+		if self.manifestFilename:
+			if resumedLinks:
+				self.recordResumedClasses(resumedLinks)
+			self.manifest.save(self.manifestFilename)
+
+	def recordResumedClasses(self, resumedLinks):
+		# classes written without a manifest record (e.g. without --incremental) are read again by the next crawl
+		classLinksByLink = dict((classLink.link, classLink) for classLink in self.classLinks)
+		numRecorded = 0
+		for record in iterClassStream(self.streamFilename):
+			classLink = classLinksByLink.get(record['link'])
+			if record['link'] in resumedLinks and classLink and 'manifest' in record:
+				self.manifest.recordStreamedClass(classLink, membersFromDicts(record['members']), record['manifest'])
+				numRecorded += 1
+		logger.info('resume: %d of %d classes already written recorded in the manifest', numRecorded, len(resumedLinks))
+
+	def iterClassData(self, classLinks):
+		if not (self.manifest and self.manifest.hasPrevious):
+			for classLink, classData, _pagesRead in self.iterReadClasses(classLinks):
+				yield classLink, classData
+			return
+
+		unchangedLinks = set(classLink for classLink in classLinks
+			if self.manifest.isClassUnchanged(classLink, self.fixups.getClassFuncDefs(classLink.name)))
+		changedLinks = [classLink for classLink in classLinks if classLink not in unchangedLinks]
+		logger.info('incremental: %d unchanged classes, %d new or changed classes', len(unchangedLinks), len(changedLinks))
+		changedData = self.iterReadClasses(changedLinks)
+		for classLink in classLinks:
+			if classLink in unchangedLinks:
+				classData, fixupsMatched = self.manifest.loadUnchangedClass(classLink)
+				# the fix-ups it was read with are still used
+				self.fixups.matched.update(fixupsMatched)
+				self.classesRead.add(classLink.name)
+				yield classLink, classData
+			else:
+				_classLink, classData, _pagesRead = next(changedData)
+				yield classLink, classData
+		# runs the reading to its end, e.g. for the final progress report and the retries of the work queue
+		for _result in changedData:
+			pass
+
+	def iterReadClasses(self, classLinks):
+		# not a generator itself, so that the classes are published to the work queue right away, even if none is read:
+		# with --incremental and no changed class no result is ever asked for, and workers would wait for the classes forever
+		if self.workQueue:
+			self.publishClasses(classLinks)
+		return self.iterRecordedClasses(classLinks)
+
+	def iterRecordedClasses(self, classLinks):
+		for classLink, classData, pagesRead, fixupsMatched in self.iterReadClassesUnrecorded(classLinks):
+			self.fixups.matched.update(fixupsMatched)
+			self.classesRead.add(classLink.name)
+			if self.manifest:
+				self.manifest.recordClass(classLink, classData, pagesRead, self.fixups.getClassFuncDefs(classLink.name), sorted(fixupsMatched))
+			yield classLink, classData, pagesRead
+
+	def iterReadClassesUnrecorded(self, classLinks):
+		# yields the keys of the fix-ups each class matched, which are recorded in the manifest
+		if self.workQueue:
+			for result in self.iterReadClassesFromQueue(classLinks):
+				yield result
+			return
+		if self.workers <= 1:
+			for i, classLink in enumerate(classLinks):
+				if self.prefetcher:
+					self.prefetcher.schedule(self.getClassFilename(aheadLink) for aheadLink in classLinks[i:i + PREFETCH_CLASSES])
+				self.pagesRead = set()
+				matched = self.fixups.takeMatched()
+				classData = self.readClass(classLink)
+				fixupsMatched = self.fixups.takeMatched()
+				self.fixups.matched = matched
+				yield classLink, classData, self.pagesRead, fixupsMatched
+			return
+
+		logger.info('reading classes using %d worker processes', self.workers)
+		tasks = [(classLink.name, classLink.category, classLink.link, classLink.namespace) for classLink in classLinks]
+		quiet = not memberLogger.isEnabledFor(logging.INFO)
+		prefetchThreads = self.prefetcher.numThreads if self.prefetcher else 0
+		pool = multiprocessing.Pool(self.workers, initializer=_initWorker, initargs=(self.baseDir, quiet, prefetchThreads, self.fixups))
+		try:
+			results = pool.imap(_readClassTask, tasks, POOL_CHUNK_SIZE)
+			for classLink, (classData, pagesRead, workerStats, fixupsMatched) in izip(classLinks, results):
+				stats.merge(workerStats)
+				yield classLink, classData, pagesRead, fixupsMatched
+			pool.close()
+		except:
+			pool.terminate()
+			raise
+		finally:
+			pool.join()
+
+	def publishClasses(self, classLinks):
+		logger.info('publishing %d classes to the work queue %s', len(classLinks), self.workQueue.filename)
+		self.workQueue.publish((classLink.name, classLink.category, classLink.link, classLink.namespace) for classLink in classLinks)
+
+	def iterReadClassesFromQueue(self, classLinks):
+		# the classes were published by iterReadClasses
+		start = lastReport = time.time()
+		numDone = 0
+		while numDone < len(classLinks):
+			finished = self.workQueue.getFinished(numDone)
+			for _itemId, state, result, error, attempts in finished:
+				classLink = classLinks[numDone]
+				if state == FAILED:
+					raise Exception('Failed to read class {} ({} attempts): {}'.format(classLink.name, attempts, error))
+				classData, relPaths, workerStats, fixupsMatched = result
+				stats.merge(workerStats)
+				numDone += 1
+				# workers may have the documentation in another directory
+				yield classLink, classData, [os.path.join(self.refDir, relPath) for relPath in relPaths], fixupsMatched
+			if time.time() - lastReport >= PROGRESS_INTERVAL or numDone == len(classLinks):
+				self.reportProgress(start)
+				lastReport = time.time()
+			if not finished:
+				time.sleep(QUEUE_POLL_INTERVAL)
+		stats.count('queue.retries', self.workQueue.getProgress()['retries'])
+
+	def reportProgress(self, start):
+		progress = self.workQueue.getProgress()
+		total = sum(progress[state] for state in ('pending', 'running', 'done', 'failed'))
+		elapsed = time.time() - start
+		rate = progress['done'] / elapsed if elapsed else 0
+		logger.info('progress: %d/%d classes done, %d running, %d pending, %d failed, %d retries, %.1f classes/s, %s left',
+			progress['done'], total, progress['running'], progress['pending'], progress['failed'], progress['retries'], rate,
+			'{:.0f} s'.format((total - progress['done']) / rate) if rate else 'unknown time')
+
 	def addUndocumented(self):
 		logger.info('Adding undocumented functions')
-		for sectionName, className, funcName, funcDef in self.UNDOCUMENTED:
-			logger.info('  Adding undocumented function: sectionName={} className={} funcName={}'.format(sectionName, className, funcName))
+		for sectionName, className, funcName, funcDef in self.fixups.iterUndocumented():
+			logger.info('  Adding undocumented function: sectionName=%s className=%s funcName=%s', sectionName, className, funcName)
 			if className not in self.classDataBySection[sectionName]:
-				logger.warn('Undocumented class does not exist: {}'.format(className))
+				logger.warn('Undocumented class does not exist: %s', className)
 				self.classDataBySection[sectionName][className] = {}
 			if funcName not in self.classDataBySection[sectionName][className]:
 				# logger.debug('Undocumented function does not exist: {}.{}'.format(className, funcName))
 				self.classDataBySection[sectionName][className][funcName] = []
+				self.fixups.matchUndocumented(sectionName, className, funcName)
 			parsedFuncDef = self.parseFuncDef(funcDef, funcName)
 			self.classDataBySection[sectionName][className][funcName].append(parsedFuncDef)
 
+	def reportUnmatchedFixups(self):
+		unmatched = list(self.fixups.iterUnmatched(self.classesRead))
+		for description in unmatched:
+			logger.warn('Fix-up matched nothing, may be stale: %s', description)
+		stats.count('fixups.unmatched', len(unmatched))
+
 	@classmethod
 	def iterSections(cls, elem):
 		class Section:
@@ -174,34 +443,64 @@ class ScriptReferenceReader(object):
 				self.elem = elem
 				self.table = table
 
-		for div in elem.xpath('./div[@class="subsection"]'):
-			titleElement = div.xpath('./h2')
+		for div in cls.SUBSECTIONS_XPATH(elem):
+			titleElement = cls.SUBSECTION_TITLE_XPATH(div)
 			title = titleElement[0].text.strip() if titleElement else None
-			tableElement = div.xpath('./table[@class="list"]')
+			tableElement = cls.SUBSECTION_TABLE_XPATH(div)
 			table = tableElement[0] if tableElement else None
 			yield Section(name=title, elem=div, table=table)
 
 	def readClass(self, classLink):
-		logger.info('class: ' + classLink.name)
-		pageFilename = os.path.join(self.refDir, classLink.link) + '.html'
+		with stats.timer('readClass', page=classLink.link + '.html'):
+			members = self.readClassPage(classLink)
+		logger.info('class: %s members=%d definitions=%d', classLink.name, len(members), sum(len(funcDefs or ()) for funcDefs in members.itervalues()))
+		return members
+
+	def readClassPage(self, classLink):
+		pageFilename = self.getClassFilename(classLink)
+		self.pagesRead.add(pageFilename)
 		try:
-			pageText = open(pageFilename, 'r').read()
+			contentText = self.prefetcher.read(pageFilename) if self.prefetcher else readContent(pageFilename)
 		except Exception, e:
-			logger.error('Could not read class: {} error={}'.format(classLink.name, e))
+			logger.error('Could not read class: %s error=%s', classLink.name, e)
 			return {};
-		page = html.fromstring(pageText)
+		content = parseContent(contentText)
+		if self.prefetcher:
+			memberFilenames = [os.path.join(self.refDir, url) for url in self.iterFunctionUrls(content)]
+			self.prefetcher.schedule(memberFilenames, URGENT)
+		try:
+			return self.readClassContent(classLink, content)
+		finally:
+			if self.prefetcher:
+				# e.g. pages whose definitions were extracted for another class
+				self.prefetcher.discard(memberFilenames)
+
+	def getClassFilename(self, classLink):
+		return os.path.join(self.refDir, classLink.link) + '.html'
+
+	def iterFunctionUrls(self, content):
+		# the member pages readClassContent reads, unless already cached
+		for sect in self.iterSections(content):
+			if EXCLUDE_INHERITED and sect.name == 'Inherited Members':
+				continue
+			for subSect in [sect] + list(self.iterSections(sect.elem)):
+				if subSect.table is not None and (subSect.name in FUNCTIONS_SECTIONS or subSect.name in MESSAGES_SECTIONS):
+					for link in self.MEMBER_LINKS_XPATH(subSect.table):
+						if not link.text.strip().startswith('operator '):
+							yield link.get('href')
+
+	def readClassContent(self, classLink, content):
 		members = {}
 		sectName = ''
-		content = page.xpath('.//div[@class="content"]/div[@class="section"]')[0]
 		for sect in self.iterSections(content):
-			logger.info('  section: {}'.format(sect.name or '-'))
+			memberLogger.info('  section: %s', sect.name or '-')
 			if EXCLUDE_INHERITED:
 				if sect.name == 'Inherited Members':
-					logger.info('    skipped (inherited)')
+					memberLogger.info('    skipped (inherited)')
 					continue
 			members.update(self.readClassSubSection(classLink.name, sect))
 			for subSect in self.iterSections(sect.elem):
-				logger.info('    subsection: {}'.format(subSect.name))
+				memberLogger.info('    subsection: %s', subSect.name)
 				members.update(self.readClassSubSection(classLink.name, subSect))
 		return members
 
@@ -210,13 +509,13 @@ class ScriptReferenceReader(object):
 			return {}
 
 		members = {}
-		for link in subSect.table.xpath('.//td[@class="lbl"]/a'):
-			funcName = link.text.strip()
+		for link in self.MEMBER_LINKS_XPATH(subSect.table):
+			funcName = internString(link.text.strip())
 			if funcName.startswith('operator '):
 				continue
 			funcUrl = link.get('href')
 			if subSect.name in VARIABLES_SECTIONS:
-				logger.info('      member: ' + funcName)
+				memberLogger.info('      member: %s', funcName)
 				# TODO: handle e.g. "this[string]" (Animation page)
 				members[funcName] = None
 			elif subSect.name in FUNCTIONS_SECTIONS or subSect.name in MESSAGES_SECTIONS:
@@ -226,244 +525,443 @@ class ScriptReferenceReader(object):
 		return members
 
 	def readFunction(self, url, className, funcName):
-		logger.info('      function: ' + funcName)
+		memberLogger.info('      function: %s', funcName)
 		funcDefs = []
+		# works around bugs in documentation
+		fixedFuncDef = self.fixups.fixFuncDef(url, className, funcName)
 		for funcDef, funcParamNames in self.iterFuncDefs(url, funcName):
-			# fixFuncDef works around bugs in documentation
-			fixedFuncDef = self.fixFuncDef(funcDef, url, className, funcName)
 			if fixedFuncDef:
 				funcDef = fixedFuncDef
 			try:
 				parsedFuncDef = self.parseFuncDef(funcDef, funcName)
-				if parsedFuncDef['params'] and parsedFuncDef['params'][0]['name'] is None:
-					if funcParamNames and len(parsedFuncDef['params']) == len(funcParamNames):
-						for param, paramName in izip(parsedFuncDef['params'], funcParamNames):
-							param['name'] = paramName
+				if parsedFuncDef.params and parsedFuncDef.params[0].name is None:
+					if funcParamNames and len(parsedFuncDef.params) == len(funcParamNames):
+						for param, paramName in izip(parsedFuncDef.params, funcParamNames):
+							param.name = internString(paramName)
 					else:
-						logger.warn('Mismatch between function definition and length of parameters section: #params={} funcParamNames={}'.format(len(parsedFuncDef['params']), funcParamNames))
+						logger.warn('Mismatch between function definition and length of parameters section: #params=%d funcParamNames=%s', len(parsedFuncDef.params), funcParamNames)
 				funcDefs.append(parsedFuncDef)
 			except Exception, e:
-				logger.error('Could not parse function definition: {} error={}'.format(funcDef, e))
+				logger.error('Could not parse function definition: %s error=%s', funcDef, e)
 		return funcDefs
 
+	@stats.timed('iterFuncDefs')
 	def iterFuncDefs(self, url, funcName):
+		# member pages are shared by many classes (e.g. inherited messages), extract each once
 		pageFilename = os.path.join(self.refDir, url)
-		pageText = open(pageFilename, 'r').read()
-		page = html.fromstring(pageText)
+		self.pagesRead.add(pageFilename)
+		return self.pageCache.getFuncDefs(pageFilename, funcName, self.extractFuncDefs)
+
+	def extractFuncDefs(self, pageFilename, funcName):
+		with stats.timer('extractFuncDefs', page=os.path.relpath(pageFilename, self.refDir)):
+			return list(self.iterExtractedFuncDefs(pageFilename, funcName))
+
+	def iterExtractedFuncDefs(self, pageFilename, funcName):
+		page = self.pageCache.getPage(pageFilename)
+		# example element -> ExampleIndex, shared by the overloads on the page
+		exampleIndexes = {}
 		defFound = False
-		for node in page.xpath('//div[@class="signature-CS sig-block"]'):
+		for node in self.SIGNATURES_XPATH(page):
 			funcDef = node.text_content().strip().replace('\r\n', '').replace('\n', '')
 			if funcDef:
 				defFound = True
 				if self.isFunctionGeneric(node):
 					funcDef = funcDef.replace('(', '.<T>(', 1)
 				topSect = self.getFuncDefSect(node)
-				funcParamNames = self.getParamNames(topSect, funcName)
+				funcParamNames = self.getParamNames(topSect, funcName, exampleIndexes)
 				yield funcDef, funcParamNames
 		if not defFound:
-			for node in page.xpath('//h1'):
+			for node in self.PAGE_TITLES_XPATH(page):
 				funcDef = node.text_content().strip().replace('\r\n', '').replace('\n', '')
 				if funcDef:
 					topSect = self.getHeaderSect(node)
-					funcParamNames = self.getParamNames(topSect, funcName)
+					funcParamNames = self.getParamNames(topSect, funcName, exampleIndexes)
 					yield self.convertHeaderToFuncDef(funcDef), funcParamNames
 
 	@classmethod
 	def isFunctionGeneric(cls, funcDefNode):
-		descriptionNode = funcDefNode.xpath('./parent::div/parent::div[@class="subsection"]/following-sibling::div[@class="subsection"]/h2[text()="Description"]')
+		descriptionNode = cls.DESCRIPTION_TITLE_XPATH(funcDefNode)
 		if descriptionNode:
-			description = descriptionNode[0].xpath('./following-sibling::p')[0].text
+			description = cls.FOLLOWING_PARAGRAPHS_XPATH(descriptionNode[0])[0].text
 			return description and description.startswith('Generic version.')
 		else:
 			return False
 
 	@classmethod
 	def getFuncDefSect(cls, funcDefNode):
-		funcDefSect = funcDefNode.xpath('./parent::div/parent::div[@class="subsection"]')[0]
+		funcDefSect = cls.FUNC_DEF_SECT_XPATH(funcDefNode)[0]
 		return funcDefSect
 
 	@classmethod
 	def getHeaderSect(cls, pageTitleNode):
-		headerSect = pageTitleNode.xpath('./parent::div[contains(@class, "mb20")]')[0]
+		headerSect = cls.HEADER_SECT_XPATH(pageTitleNode)[0]
 		return headerSect
 
 	@classmethod
-	def getParamNames(cls, topSect, funcName):
+	@stats.timed('getParamNames')
+	def getParamNames(cls, topSect, funcName, exampleIndexes):
 		try:
-			paramsTitleNode = topSect.xpath('./following-sibling::div[@class="subsection"]/h2[text()="Parameters"]')
+			paramsTitleNode = cls.PARAMS_TITLE_XPATH(topSect)
 			paramNames = cls.parseParametersSection(paramsTitleNode)
 			if paramNames:
 				return paramNames
 
-			exampleNode = topSect.xpath('./following-sibling::div[@class="subsection"]/pre[@class="codeExampleJS" or @class="codeExampleRaw"]')
-			paramNames = cls.getFunctionParamNamesFromExample(exampleNode, funcName)
+			exampleNode = cls.EXAMPLES_XPATH(topSect)
+			paramNames = cls.getFunctionParamNamesFromExample(exampleNode, funcName, exampleIndexes)
 			return paramNames
 		except Exception, e:
-			logger.warn('Could not find function parameter names: {} error={}'.format(funcName, e))
+			logger.warn('Could not find function parameter names: %s error=%s', funcName, e)
 			return None
 
 	@classmethod
 	def parseParametersSection(cls, paramsTitleNode):
 		if paramsTitleNode:
-			paramNames = paramsTitleNode[0].xpath('./following-sibling::table')[0].xpath('.//td[@class="name lbl"]/text()')
+			paramNames = cls.PARAM_NAMES_XPATH(cls.FOLLOWING_TABLES_XPATH(paramsTitleNode[0])[0])
 			return paramNames
 		else:
 			return None
 
 	@classmethod
-	def getFunctionParamNamesFromExample(cls, exampleNode, funcName):
+	def getFunctionParamNamesFromExample(cls, exampleNode, funcName, exampleIndexes):
 		if exampleNode:
-			example = exampleNode[0].text_content().strip().replace('\r\n', '').replace('\n', '')
-			m = re.search(r'\b(%s\s*\(.+?)\s*\{' % re.escape(funcName), example)
-			if not m:
-				logger.debug('Function definition not found in example: ' + funcName)
-				return None
-			funcDef = m.group(1)
-			parsedFuncDef = cls.parseFuncDef(funcDef, funcName)
-			return [param['name'] for param in parsedFuncDef['params']]
+			exampleIndex = exampleIndexes.get(exampleNode[0])
+			if exampleIndex is None:
+				example = exampleNode[0].text_content().strip().replace('\r\n', '').replace('\n', '')
+				exampleIndex = exampleIndexes[exampleNode[0]] = cls.ExampleIndex(example)
+			return exampleIndex.getParamNames(funcName)
 		else:
 			return None
 
+	class ExampleIndex(object):
+		"""The function definitions of an example, by function name, found in a single pass over the example."""
+
+		def __init__(self, example):
+			stats.count('exampleIndex.examples')
+			self.example = example
+			# function name -> definition text, then parameter names once parsed
+			self.funcDefs = {}
+			self.paramNames = {}
+			reader = ScriptReferenceReader
+			for m in reader.EXAMPLE_CALL_RE.finditer(example):
+				name = m.group(1)
+				if name in self.funcDefs:
+					continue
+				# the first occurrence followed by a definition, as the search by name did
+				tail = reader.EXAMPLE_FUNC_DEF_TAIL_RE.match(example, m.end(1))
+				if tail:
+					self.funcDefs[name] = example[m.start(1):tail.end()]
+
+		def getParamNames(self, funcName):
+			paramNames = self.paramNames.get(funcName)
+			if paramNames is not None:
+				stats.sample('exampleIndex.hitRate', 1)
+				return paramNames
+			if ScriptReferenceReader.NAME_RE.match(funcName):
+				funcDef = self.funcDefs.get(funcName)
+			else:
+				# e.g. operators, not found by EXAMPLE_CALL_RE
+				funcDef = self.findFuncDef(funcName)
+			stats.sample('exampleIndex.hitRate', 1 if funcDef else 0)
+			if funcDef is None:
+				memberLogger.debug('Function definition not found in example: %s', funcName)
+				return None
+			paramNames = self.paramNames[funcName] = [param.name for param in ScriptReferenceReader.parseFuncDef(funcDef, funcName).params]
+			return paramNames
+
+		def findFuncDef(self, funcName):
+			reader = ScriptReferenceReader
+			for start, m in reader.iterFuncNameMatches(self.example, funcName, reader.EXAMPLE_FUNC_DEF_TAIL_RE):
+				if reader.isWordBoundary(self.example, start):
+					return self.example[start:m.end()]
+			return None
+
 	@classmethod
 	def convertHeaderToFuncDef(cls, funcDef):
 		if '(' not in funcDef:
 			funcDef += '()'
 		if '.' in funcDef:
-			funcDef = re.sub(r'.+\.', '', funcDef)
+			funcDef = cls.HEADER_QUALIFIER_RE.sub('', funcDef)
 		return funcDef
 
 	@classmethod
-	def fixFuncDef(cls, funcDef, url, className, funcName):
-		if className == 'Vector4' and funcName == 'Vector2':
-			return 'Vector2()'
-		elif className == 'Array' and funcName == 'Unshift':
-			return 'Unshift()'
-		elif className == 'Font' and funcName == 'Font' and url == 'Font.TextureChangedDelegate.html':
-			return 'Font()'
-		elif className == 'StateMachineBehaviour':
-			if funcName == 'OnStateEnter':
-				return 'StateMachineBehaviour.OnStateEnter(Animator animator, AnimatorStateInfo animatorStateInfo, int layerIndex)'
-			elif funcName == 'OnStateExit':
-				return 'StateMachineBehaviour.OnStateExit(Animator animator, AnimatorStateInfo animatorStateInfo, int layerIndex)'
-			elif funcName == 'OnStateIK':
-				return 'StateMachineBehaviour.OnStateIK(Animator animator, AnimatorStateInfo animatorStateInfo, int layerIndex)'
-			elif funcName == 'OnStateMove':
-				return 'StateMachineBehaviour.OnStateMove(Animator animator, AnimatorStateInfo animatorStateInfo, int layerIndex)'
-			elif funcName == 'OnStateUpdate':
-				return 'StateMachineBehaviour.OnStateUpdate(Animator animator, AnimatorStateInfo animatorStateInfo, int layerIndex)'
-		elif className == 'AssetPostprocessor' and funcName == 'OnPreprocessAnimation':
-			return 'OnPreprocessAnimation()'
-		elif className == 'LODGroup' and funcName == 'SetLODs':
-			return 'SetLODs(LOD[] lods)'
-
-		# missing parameter names
-		elif className == 'AssetPostprocessor' and funcName == 'OnPostprocessAssetbundleNameChanged':
-			return 'OnPostprocessAssetbundleNameChanged(string assetPath, stringpreviousAssetBundleName, string newAssetBundleName)'
-		elif className == 'AssetPostprocessor' and funcName == 'OnPostprocessAudio':
-			return 'OnPostprocessAudio(AudioClip clip)'
-		elif className == 'AssetPostprocessor' and funcName == 'OnPostprocessSpeedTree':
-			return 'OnPostprocessSpeedTree(GameObject go)'
-		elif className == 'AssetPostprocessor' and funcName == 'OnPostprocessTexture':
-			return 'OnPostprocessTexture(Texture2D texture)'
-		elif className == 'MaterialEditor' and funcName == 'LightmapEmissionProperty':
-			return 'LightmapEmissionProperty(int labelIndent)'
-		elif className == 'StaticOcclusionCulling' and funcName == 'Compute':
-			return 'Compute(float viewCellSize, float nearClipPlane, float farClipPlane, int memoryLimit, StaticOcclusionCullingMode mode)'
-		elif className == 'TextureImporter' and funcName == 'ReadTextureImportInstructions':
-			return 'ReadTextureImportInstructions(TextureImportInstructions instructions)'
-		elif className == 'Array' and funcName == 'Array':
-			return 'Array(int arrayLength)'
-		elif className == 'AssetModificationProcessor' and funcName == 'IsOpenForEdit':
-			return 'IsOpenForEdit(string assetPath, string message)'
-		elif className == 'AssetModificationProcessor' and funcName == 'OnWillCreateAsset':
-			return 'OnWillCreateAsset(string path)'
-		elif className == 'AssetModificationProcessor' and funcName == 'OnWillDeleteAsset':
-			return 'AssetDeleteResult OnWillDeleteAsset(string assetPath, RemoveAssetOptions option)'
-		elif className == 'AssetModificationProcessor' and funcName == 'OnWillMoveAsset':
-			return 'AssetMoveResult OnWillMoveAsset(string oldPath, string newPath)'
-		elif className == 'AssetModificationProcessor' and funcName == 'OnWillSaveAssets':
-			return 'string[] OnWillSaveAssets(string[] paths)'
-		elif className == 'Hashtable':
-			if funcName == 'Add':
-				return 'Add(object key, object value)'
-			elif funcName == 'Contains':
-				return 'bool Contains(object key)'
-			elif funcName == 'ContainsKey':
-				return 'bool ContainsKey(object key)'
-			elif funcName == 'ContainsValue':
-				return 'bool ContainsValue(object value)'
-			elif funcName == 'Remove':
-				return 'Remove(object key)'
-		elif className == 'Path':
-			if funcName == 'Combine':
-				return 'string Combine(String path1, string path2)'
-			elif funcName == 'GetExtension':
-				return 'string GetExtension(string path)'
-			elif funcName == 'GetFileName':
-				return 'string GetFileName(string path)'
-			elif funcName == 'GetFileNameWithoutExtension':
-				return 'string GetFileNameWithoutExtension(string path)'
-		elif className == 'Collider':
-			if funcName == 'OnCollisionEnter':
-				return 'OnCollisionEnter(Collision collisionInfo)'
-			elif funcName == 'OnTriggerExit':
-				return 'OnTriggerExit(Collider other)'
-			elif funcName == 'OnTriggerStay':
-				return 'OnTriggerStay(Collider other)'
-		elif className == 'Collider2D':
-			if funcName == 'OnTriggerExit2D':
-				return 'OnTriggerExit2D(Collider2D other)'
-			elif funcName == 'OnTriggerStay2D':
-				return 'OnTriggerStay2D(Collider2D other)'
-		elif className == 'MonoBehaviour':
-			if funcName == 'OnCollisionEnter':
-				return 'OnCollisionEnter(Collision collisionInfo)'
-			elif funcName == 'OnTriggerStay2D':
-				return 'OnTriggerStay2D(Collider2D other)'
-
-		return None
-
-	@classmethod
+	@stats.timed('parseFuncDef')
 	def parseFuncDef(cls, funcDef, funcName):
-		logger.debug('        def: ' + funcDef)
-		#              name .<temp>?     (   params     )   : returnType
-		m = re.search(r'%s(\.?<\S+>)?\s*\(\s*([^)]*)\s*\)\s*:?\s*(\S+)?' % re.escape(funcName), funcDef)
-		if not m:
+		memberLogger.debug('        def: %s', funcDef)
+		for start, m in cls.iterFuncNameMatches(funcDef, funcName, cls.FUNC_DEF_TAIL_RE):
+			break
+		else:
 			raise Exception('Function definition structure does not match: ' + funcDef)
 		template = m.group(1)
-		# split by commas but ignore: "[,,,,]"
-		# allow commas inside <> and inside []
-		params = re.findall(r'[^,<\[]+(?:\<[^>]*\>)?(?:\[[^\]]*\])?[^,]*', m.group(2))
+		params = cls.FUNC_PARAMS_RE.findall(m.group(2))
 		if params == ['']: params = []
 		params = map(str.strip, params)
 		params = map(cls.parseParam, params)
 		returnType = m.group(3)
-		logger.info('           template: ' + str(template))
-		logger.info('           params: ' + str(params))
-		logger.info('           returnType: ' + str(returnType))
-		return {
-			'template': template,
-			'params': params,
-			'returnType': returnType
-		}
+		declaredType = None
+		if returnType is None or not RETURN_TYPE_RE.match(returnType):
+			# C# signatures end with ";" and the type comes before the name; kept apart, the output has returnType as is
+			declaredType = cls.parseDeclaredType(funcDef[:start])
+		memberLogger.info('           template: %s', template)
+		memberLogger.info('           params: %s', params)
+		memberLogger.info('           returnType: %s', returnType)
+		return FuncDef(template, params, returnType, declaredType)
+
+	@classmethod
+	def parseDeclaredType(cls, prefix):
+		m = cls.LEADING_RETURN_TYPE_RE.search(prefix)
+		if not m or m.group(1) in cls.MODIFIERS:
+			# e.g. constructors
+			return None
+		return m.group(1)
+
+	@classmethod
+	def iterFuncNameMatches(cls, text, funcName, tailRe):
+		# same as searching for re.escape(funcName) + tailRe, without compiling a pattern per name
+		start = text.find(funcName)
+		while start != -1:
+			m = tailRe.match(text, start + len(funcName))
+			if m:
+				yield start, m
+			start = text.find(funcName, start + 1)
+
+	@classmethod
+	def isWordBoundary(cls, text, pos):
+		# same as \b at pos
+		before = pos > 0 and cls.WORD_CHAR_RE.match(text, pos - 1) is not None
+		after = cls.WORD_CHAR_RE.match(text, pos) is not None
+		return before != after
 
 	@classmethod
 	def parseParam(cls, param):
-		m = re.search(r'^((?:(?:out|ref|params) )?[\w\.,<>\[\]]+)(?:\s+(\w+)(?:\s*=\s*([\w\-\.\"]+))?)?$', param)
+		m = cls.PARAM_RE.search(param)
 		if not m:
 			raise Exception('Could not parse function param: ' + param)
 		type_ = m.group(1)
 		paramName = m.group(2)
 		default = m.group(3)
-		return {
-			'name': paramName,
-			'type': type_,
-			'default': default
-		}
-
-	def save(self, filename):
-		pickle.dump(self.classDataBySection, open(filename, 'wb'), pickle.HIGHEST_PROTOCOL)		
-
-reader = ScriptReferenceReader(baseDir=BASE_DIR)
-reader.read()
-reader.save(OUTPUT_FILENAME)
+		return Param(paramName, type_, default)
+
+	@stats.timed('save')
+	def save(self, filename, compactFilename=None, searchIndexFilename=None, completionsFilename=None, hashesFilename=None, shareRecords=False):
+		# shared records make the pickle smaller, but a consumer changing one of them changes it for every member having it
+		classDataBySection = self.canonicalize(self.classDataBySection, records={} if shareRecords else None)
+		canonical_pickle.dump(classDataBySection, filename)
+		if compactFilename:
+			CompactWriter().write(compactFilename, classDataBySection)
+		if searchIndexFilename or completionsFilename:
+			declaredTypes = self.getDeclaredTypes()
+		if searchIndexFilename:
+			SearchIndexWriter().write(searchIndexFilename, classDataBySection, declaredTypes)
+		if completionsFilename:
+			CompletionExportWriter().write(completionsFilename, classDataBySection, declaredTypes)
+		if hashesFilename:
+			self.saveHashes(hashesFilename, classDataBySection)
+
+	def getDeclaredTypes(self):
+		# section -> class -> function -> declared type of each definition, for the outputs deriving return types
+		declaredTypes = {}
+		for sectionName, classData in self.classDataBySection.iteritems():
+			declaredTypes[sectionName] = sectionTypes = {}
+			for className, members in classData.iteritems():
+				sectionTypes[className] = dict((memberName, [funcDef.declaredType for funcDef in funcDefs])
+					for memberName, funcDefs in members.iteritems() if funcDefs is not None)
+		return declaredTypes
+
+	def saveHashes(self, filename, classDataBySection):
+		hashes = ContentHashes.compute(classDataBySection)
+		if os.path.isfile(filename):
+			changed = hashes.getChangedClasses(ContentHashes.load(filename))
+			logger.info('content hash: %s, %d classes changed since the previous crawl', hashes.datasetHash, len(changed))
+			for sectionName, className in changed:
+				memberLogger.info('  changed class: %s: %s', sectionName, className)
+			stats.count('hashes.changedClasses', len(changed))
+		else:
+			logger.info('content hash: %s', hashes.datasetHash)
+		hashes.save(filename)
+
+	@classmethod
+	def canonicalize(cls, obj, strings=None, records=None):
+		# rebuilds dicts in sorted key order, converts function definitions to dicts and shares equal strings,
+		# so the pickle does not depend on how (or in which process) the data was built;
+		# given a records dictionary, also stores repeated definitions (e.g. of inherited messages) and parameters once
+		if strings is None:
+			strings = {}
+		if isinstance(obj, FuncDef):
+			funcDef = cls.canonicalize(obj.toDict(), strings, records)
+			if records is None:
+				return funcDef
+			funcDef['params'] = [cls.shareRecord(param, records) for param in funcDef['params']]
+			return cls.shareRecord(funcDef, records)
+		elif isinstance(obj, dict):
+			canonical = {}
+			for key in sorted(obj):
+				canonical[cls.canonicalize(key, strings, records)] = cls.canonicalize(obj[key], strings, records)
+			return canonical
+		elif isinstance(obj, list):
+			return [cls.canonicalize(item, strings, records) for item in obj]
+		elif isinstance(obj, basestring):
+			# keyed by type too, since 'x' == u'x' in Python 2
+			return strings.setdefault((type(obj), obj), obj)
+		else:
+			return obj
+
+	@classmethod
+	def shareRecord(cls, record, records):
+		# the values of a canonical record are shared objects, so equal records have values with equal ids
+		key = tuple((name, tuple(map(id, value)) if isinstance(value, list) else id(value)) for name, value in sorted(record.iteritems()))
+		return records.setdefault(key, record)
+
+# worker process state, see ScriptReferenceReader.iterClassData
+_workerReader = None
+
+def _initWorker(baseDir, quiet, prefetchThreads, fixups):
+	global _workerReader
+	if logger.handlers:
+		# log directly, a forked process does not have the parent's background logging thread
+		setupLogging(quiet=quiet, background=False, truncate=False)
+	# each worker prefetches the member pages of its current class
+	prefetcher = Prefetcher(prefetchThreads) if prefetchThreads else None
+	_workerReader = ScriptReferenceReader(baseDir=baseDir, prefetcher=prefetcher, fixups=fixups)
+
+def _readClassTask(task):
+	name, category, link, namespace = task
+	classLink = ScriptReferenceReader.ClassLink(name=name, category=category, link=link, namespace=namespace)
+	_workerReader.pagesRead = set()
+	classData = _workerReader.readClass(classLink)
+	return classData, _workerReader.pagesRead, stats.take(), _workerReader.fixups.takeMatched()
+
+def runWorker(queueFilename, baseDir, prefetchThreads=0):
+	"""Reads classes published to a work queue by a coordinator (see ScriptReferenceReader.iterReadClassesFromQueue),
+	until none are left."""
+	global _workerReader
+	prefetcher = Prefetcher(prefetchThreads) if prefetchThreads else None
+	_workerReader = ScriptReferenceReader(baseDir=baseDir, prefetcher=prefetcher)
+	workQueue = WorkQueue(queueFilename)
+	workerName = '{}:{}'.format(socket.gethostname(), os.getpid())
+	logger.info('worker %s: reading classes from %s', workerName, queueFilename)
+	numRead = 0
+	try:
+		while True:
+			item = workQueue.claim(workerName)
+			if item is None:
+				# other workers' classes may still be returned to the queue, or the classes not published yet
+				if workQueue.isFinished():
+					break
+				time.sleep(QUEUE_POLL_INTERVAL)
+				continue
+			try:
+				classData, pagesRead, workerStats, fixupsMatched = _readClassTask(item.task)
+			except Exception:
+				logger.exception('Failed to read class %s (attempt %d)', item.task[0], item.attempts)
+				workQueue.fail(item, traceback.format_exc())
+				continue
+			relPaths = sorted(os.path.relpath(filename, _workerReader.refDir) for filename in pagesRead)
+			if workQueue.complete(item, (classData, relPaths, workerStats, fixupsMatched)):
+				numRead += 1
+			else:
+				logger.warn('Class %s was claimed by another worker, result dropped', item.task[0])
+	finally:
+		workQueue.close()
+		if prefetcher:
+			prefetcher.close()
+	logger.info('worker %s: no classes left, read %d', workerName, numRead)
+
+def main():
+	parser = argparse.ArgumentParser(description='Crawls Unity Scripting Reference.')
+	parser.add_argument('--base-dir', default=BASE_DIR, help='Unity documentation directory (default: %(default)s)')
+	parser.add_argument('--output', help='output file (default: %s, or %s with --versions)' % (OUTPUT_FILENAME, VERSIONS_FILENAME))
+	parser.add_argument('--workers', type=int, default=1, help='number of processes reading class pages (default: %(default)s)')
+	parser.add_argument('--incremental', action='store_true', help='only read pages changed since the previous incremental crawl (keeps a manifest next to the output file)')
+	parser.add_argument('--stream', nargs='?', const=STREAM_FILENAME, metavar='FILE', help='write classes to a JSON Lines file as they are read, for --resume; does not reduce memory use (default: %s)' % STREAM_FILENAME)
+	parser.add_argument('--resume', action='store_true', help='skip classes already written to the --stream file')
+	parser.add_argument('--quiet', action='store_true', help='log a summary line per class instead of every section and member')
+	parser.add_argument('--stats-json', metavar='FILE', help='write the crawl stats (stage timers, counters, slowest pages) to a JSON file')
+	parser.add_argument('--prefetch', type=int, default=0, metavar='THREADS', help='read pages ahead on this many threads while parsing (default: off)')
+	parser.add_argument('--versions', nargs='+', type=parseVersionDir, metavar='NAME=DIR', help='crawl several Unity versions into a single dataset, see multi_version.py (with --workers, member pages are not shared across versions)')
+	parser.add_argument('--coordinator', metavar='QUEUE', help='publish the classes to a work queue file and collect them from --worker processes')
+	parser.add_argument('--worker', metavar='QUEUE', help='read the classes published to a work queue file by a --coordinator, then exit')
+	parser.add_argument('--share-records', action='store_true', help='store equal function definitions and parameters once in the pickle, shared by the loaded data')
+	parser.add_argument('--profile', metavar='FILE', help='run under cProfile and write the profile to a file (worker processes are not profiled)')
+	args = parser.parse_args()
+	if args.resume and not args.stream:
+		parser.error('--resume requires --stream')
+	if args.versions and (args.incremental or args.stream):
+		parser.error('--versions cannot be used with --incremental or --stream')
+	if args.coordinator and (args.versions or args.workers > 1):
+		parser.error('--coordinator cannot be used with --versions or --workers')
+	if args.worker and (args.coordinator or args.versions or args.incremental or args.stream or args.workers > 1):
+		parser.error('--worker cannot be used with --coordinator, --versions, --incremental, --stream or --workers')
+
+	logFilename = WORKER_LOG_FILENAME.format(os.getpid()) if args.worker else LOG_FILENAME
+	setupLogging(quiet=args.quiet, background=args.quiet, filename=logFilename)
+	prefetcher = Prefetcher(args.prefetch) if args.prefetch > 0 and not args.worker else None
+	if args.worker:
+		crawlFunc, crawlArgs = runWorker, (args.worker, args.base_dir, args.prefetch)
+	elif args.versions:
+		crawlFunc, crawlArgs = crawlVersions, (args.versions, args.output or VERSIONS_FILENAME, args.workers, prefetcher, args.share_records)
+	else:
+		output = args.output or OUTPUT_FILENAME
+		manifestFilename = output + MANIFEST_SUFFIX if args.incremental else None
+		workQueue = None
+		if args.coordinator:
+			# workers started from now on wait for this crawl's classes
+			workQueue = WorkQueue(args.coordinator)
+			workQueue.reset()
+		reader = ScriptReferenceReader(baseDir=args.base_dir, workers=args.workers, manifestFilename=manifestFilename,
+			streamFilename=args.stream, resume=args.resume, prefetcher=prefetcher, workQueue=workQueue)
+		outputBasename = os.path.splitext(output)[0]
+		crawlFunc, crawlArgs = crawl, (reader, output, outputBasename + COMPACT_EXTENSION, outputBasename + SEARCH_INDEX_EXTENSION,
+			outputBasename + COMPLETIONS_EXTENSION, outputBasename + HASHES_EXTENSION, args.share_records)
+	try:
+		if args.profile:
+			profiler = cProfile.Profile()
+			profiler.runcall(crawlFunc, *crawlArgs)
+			profiler.dump_stats(args.profile)
+			pstats.Stats(profiler).sort_stats('cumulative').print_stats(PROFILE_NUM_LINES)
+		else:
+			crawlFunc(*crawlArgs)
+	finally:
+		if prefetcher:
+			prefetcher.close()
+
+	for line in stats.formatTable().splitlines():
+		logger.info(line)
+	if args.stats_json:
+		stats.saveJson(args.stats_json)
+
+def crawl(reader, filename, compactFilename, searchIndexFilename, completionsFilename, hashesFilename, shareRecords=False):
+	with stats.timer('total'):
+		reader.read()
+		reader.save(filename, compactFilename=compactFilename, searchIndexFilename=searchIndexFilename,
+			completionsFilename=completionsFilename, hashesFilename=hashesFilename, shareRecords=shareRecords)
+
+def parseVersionDir(value):
+	version, sep, baseDir = value.partition('=')
+	if not (version and sep and baseDir):
+		raise argparse.ArgumentTypeError('expected NAME=DIR: {}'.format(value))
+	return version, baseDir
+
+def crawlVersions(versionDirs, filename, workers, prefetcher=None, shareRecords=False):
+	# member pages identical to those of a previous version are extracted once, and classes whose pages
+	# are all identical to those of the previous version are taken from it, via a manifest;
+	# with workers, member pages are extracted by each version's worker processes, which do not share pageCache
+	dataset = VersionedDataset()
+	pageCache = PageCache(byContent=True, prefetcher=prefetcher)
+	# equal strings, and definitions with --share-records, are shared across versions too
+	strings = {}
+	records = {} if shareRecords else None
+	manifest = None
+	with stats.timer('total'):
+		for version, baseDir in versionDirs:
+			logger.info('version: %s base dir=%s', version, baseDir)
+			refDir = os.path.join(baseDir, ScriptReferenceReader.REFERENCE_DIR)
+			manifest = Manifest.fromOther(manifest, refDir) if manifest else Manifest(refDir)
+			reader = ScriptReferenceReader(baseDir=baseDir, workers=workers, manifest=manifest, pageCache=pageCache, prefetcher=prefetcher)
+			reader.read()
+			with stats.timer('add version'):
+				dataset.add(version, reader.canonicalize(reader.classDataBySection, strings, records))
+		with stats.timer('save'):
+			dataset.save(filename)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,136 @@
+DEFAULT_NUM_SLOWEST_PAGES = 10
+
+import time
+import json
+import heapq
+import functools
+from contextlib import contextmanager
+
+class CrawlStats(object):
+	"""Per-stage timers, counters, sampled values and the slowest pages of a crawl.
+
+	Stage times are inclusive, e.g. the time of readClass includes that of parseFuncDef.
+	Worker processes send their stats to the main process with take(), which are added with merge().
+	"""
+
+	def __init__(self, numSlowestPages=DEFAULT_NUM_SLOWEST_PAGES):
+		self.numSlowestPages = numSlowestPages
+		self.reset()
+
+	def reset(self):
+		# stage -> [calls, seconds]
+		self.timers = {}
+		self.counters = {}
+		# name -> [samples, total, max]
+		self.samples = {}
+		# min-heap of (seconds, page)
+		self.slowestPages = []
+
+	def addTime(self, stage, seconds):
+		timer = self.timers.get(stage)
+		if timer is None:
+			timer = self.timers[stage] = [0, 0.0]
+		timer[0] += 1
+		timer[1] += seconds
+
+	@contextmanager
+	def timer(self, stage, page=None):
+		start = time.time()
+		try:
+			yield
+		finally:
+			seconds = time.time() - start
+			self.addTime(stage, seconds)
+			if page is not None:
+				self.addPage(page, seconds)
+
+	def timed(self, stage):
+		def decorator(func):
+			@functools.wraps(func)
+			def wrapper(*args, **kwargs):
+				start = time.time()
+				try:
+					return func(*args, **kwargs)
+				finally:
+					self.addTime(stage, time.time() - start)
+			return wrapper
+		return decorator
+
+	def count(self, name, value=1):
+		self.counters[name] = self.counters.get(name, 0) + value
+
+	def sample(self, name, value):
+		sample = self.samples.get(name)
+		if sample is None:
+			sample = self.samples[name] = [0, 0, value]
+		sample[0] += 1
+		sample[1] += value
+		sample[2] = max(sample[2], value)
+
+	def addPage(self, page, seconds):
+		if len(self.slowestPages) < self.numSlowestPages:
+			heapq.heappush(self.slowestPages, (seconds, page))
+		elif seconds > self.slowestPages[0][0]:
+			heapq.heapreplace(self.slowestPages, (seconds, page))
+
+	def take(self):
+		stats = self.toDict()
+		self.reset()
+		return stats
+
+	def merge(self, stats):
+		for stage, (calls, seconds) in stats['timers'].iteritems():
+			timer = self.timers.setdefault(stage, [0, 0.0])
+			timer[0] += calls
+			timer[1] += seconds
+		for name, value in stats['counters'].iteritems():
+			self.count(name, value)
+		for name, (count, total, maxValue) in stats['samples'].iteritems():
+			sample = self.samples.setdefault(name, [0, 0, maxValue])
+			sample[0] += count
+			sample[1] += total
+			sample[2] = max(sample[2], maxValue)
+		for seconds, page in stats['slowestPages']:
+			self.addPage(page, seconds)
+
+	def toDict(self):
+		return {
+			'timers': self.timers,
+			'counters': self.counters,
+			'samples': self.samples,
+			'slowestPages': sorted(self.slowestPages, reverse=True)
+		}
+
+	def saveJson(self, filename):
+		stats = self.toDict()
+		json.dump({
+			'timers': dict((stage, {'calls': calls, 'seconds': seconds}) for stage, (calls, seconds) in stats['timers'].iteritems()),
+			'counters': stats['counters'],
+			'samples': dict((name, {'count': count, 'mean': float(total) / count, 'max': maxValue})
+				for name, (count, total, maxValue) in stats['samples'].iteritems()),
+			'slowestPages': [{'page': page, 'seconds': seconds} for seconds, page in stats['slowestPages']]
+		}, open(filename, 'w'), indent=2, sort_keys=True)
+
+	def formatTable(self):
+		lines = ['{:<24} {:>10} {:>12} {:>12}'.format('stage', 'calls', 'total s', 'mean ms')]
+		for stage, (calls, seconds) in sorted(self.timers.iteritems(), key=lambda item: -item[1][1]):
+			lines.append('{:<24} {:>10} {:>12.3f} {:>12.3f}'.format(stage, calls, seconds, seconds / calls * 1000 if calls else 0))
+		if self.counters:
+			lines.append('')
+			lines.append('{:<24} {:>10}'.format('counter', 'value'))
+			for name, value in sorted(self.counters.iteritems()):
+				lines.append('{:<24} {:>10}'.format(name, value))
+		if self.samples:
+			lines.append('')
+			lines.append('{:<24} {:>10} {:>12} {:>12}'.format('sample', 'count', 'mean', 'max'))
+			for name, (count, total, maxValue) in sorted(self.samples.iteritems()):
+				lines.append('{:<24} {:>10} {:>12.2f} {:>12}'.format(name, count, float(total) / count, maxValue))
+		if self.slowestPages:
+			lines.append('')
+			lines.append('slowest pages:')
+			for seconds, page in sorted(self.slowestPages, reverse=True):
+				lines.append('{:>10.1f} ms  {}'.format(seconds * 1000, page))
+		return '\n'.join(lines)
+
+# the stats of the current process
+stats = CrawlStats()
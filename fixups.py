@@ -0,0 +1,88 @@
+"""Workarounds for bugs in the documentation, loaded from fixups.json.
+
+The file holds:
+
+* "classLinks" - Class page links to replace, by the link in the class list
+* "funcDefs" - Function definitions to use instead of the documented ones, each with the keys
+  "class", "function", "funcDef", and optionally "url" (to match a single member page) and "note"
+* "undocumented" - Function definitions missing from the documentation, each with the keys
+  "section", "class", "function" and "funcDef"
+
+Fix-ups that match nothing are reported, so that those fixed in the documentation can be removed.
+"""
+import os
+import json
+from class_stream import decodeStrings
+
+FIXUPS_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixups.json')
+
+class Fixups(object):
+	def __init__(self, classLinks, funcDefs, undocumented):
+		self.classLinks = classLinks
+		# (class name, function name, url or None) -> function definition
+		self.funcDefs = dict(((entry['class'], entry['function'], entry.get('url')), entry['funcDef']) for entry in funcDefs)
+		# class name -> sorted (key, function definition) pairs of its funcDefs
+		self.funcDefsByClass = {}
+		for key, funcDef in sorted(self.funcDefs.iteritems()):
+			self.funcDefsByClass.setdefault(key[0], []).append((key, funcDef))
+		self.undocumented = undocumented
+		# keys of the fix-ups used: class links, funcDefs keys and (section, class, function) of undocumented functions
+		self.matched = set()
+
+	@classmethod
+	def load(cls, filename=FIXUPS_FILENAME):
+		# strings are converted to str, like those read from the documentation
+		fixups = decodeStrings(json.load(open(filename, 'r')))
+		return cls(fixups['classLinks'], fixups['funcDefs'], fixups['undocumented'])
+
+	def fixClassLink(self, link):
+		fixedLink = self.classLinks.get(link)
+		if fixedLink is None:
+			return link
+		self.matched.add(link)
+		return fixedLink
+
+	def fixFuncDef(self, url, className, funcName):
+		"""Returns the definition to use instead of the documented ones, or None."""
+		key = (className, funcName, url)
+		funcDef = self.funcDefs.get(key)
+		if funcDef is None:
+			key = (className, funcName, None)
+			funcDef = self.funcDefs.get(key)
+			if funcDef is None:
+				return None
+		self.matched.add(key)
+		return funcDef
+
+	def getClassFuncDefs(self, className):
+		"""Returns the function definition fix-ups of a class, which a reused class must have been read with."""
+		return self.funcDefsByClass.get(className, [])
+
+	def iterUndocumented(self):
+		"""Yields (section, class, function, function definition) tuples; call matchUndocumented for those added."""
+		for entry in self.undocumented:
+			yield entry['section'], entry['class'], entry['function'], entry['funcDef']
+
+	def matchUndocumented(self, sectionName, className, funcName):
+		self.matched.add((sectionName, className, funcName))
+
+	def takeMatched(self):
+		matched = self.matched
+		self.matched = set()
+		return matched
+
+	def iterUnmatched(self, classNames):
+		"""Yields descriptions of the fix-ups that matched nothing.
+
+		Function definition fix-ups are only considered for the given classes (those read or reused in this crawl).
+		"""
+		for link in sorted(self.classLinks):
+			if link not in self.matched:
+				yield 'class link {}'.format(link)
+		for key in sorted(self.funcDefs):
+			className, funcName, url = key
+			if className in classNames and key not in self.matched:
+				yield 'definition of {}.{}{}'.format(className, funcName, ' in ' + url if url else '')
+		for sectionName, className, funcName, _funcDef in self.iterUndocumented():
+			if (sectionName, className, funcName) not in self.matched:
+				yield 'undocumented {}.{} (now documented)'.format(className, funcName)
@@ -0,0 +1,88 @@
+"""Compact in-memory model of function definitions.
+
+A crawl parses tens of thousands of signatures, most of them sharing a handful of type names
+(float, Vector3, GameObject...). FuncDef and Param are __slots__ records holding interned strings,
+and definitions without parameters share the EMPTY_PARAMS tuple.
+The output keeps the dict format ({'template', 'params', 'returnType'} and {'name', 'type', 'default'}),
+see toDict() and fromDict().
+FuncDef also keeps the type preceding the name in C# signatures (declaredType), which is not part of the output;
+search_index.getReturnType() derives the return type from both.
+"""
+
+EMPTY_PARAMS = ()
+
+def internString(s):
+	if type(s) is str or s is None:
+		return s and intern(s)
+	# intern() only takes plain str; str() also drops str subclasses, e.g. lxml smart strings referencing their tree
+	elif isinstance(s, str):
+		return intern(str(s))
+	elif isinstance(s, unicode):
+		return unicode(s)
+	return s
+
+class Param(object):
+	__slots__ = ('name', 'type', 'default')
+
+	def __init__(self, name, type_, default):
+		self.name = internString(name)
+		self.type = internString(type_)
+		self.default = internString(default)
+
+	def __reduce__(self):
+		# pickled as constructor arguments, so strings are interned again when unpickled
+		return (Param, (self.name, self.type, self.default))
+
+	def __repr__(self):
+		return 'Param({!r}, {!r}, {!r})'.format(self.name, self.type, self.default)
+
+	def toDict(self):
+		return {
+			'name': self.name,
+			'type': self.type,
+			'default': self.default
+		}
+
+	@classmethod
+	def fromDict(cls, param):
+		return cls(param['name'], param['type'], param['default'])
+
+class FuncDef(object):
+	__slots__ = ('template', 'params', 'returnType', 'declaredType')
+
+	def __init__(self, template, params, returnType, declaredType=None):
+		self.template = internString(template)
+		self.params = tuple(params) or EMPTY_PARAMS
+		self.returnType = internString(returnType)
+		self.declaredType = internString(declaredType)
+
+	def __reduce__(self):
+		return (FuncDef, (self.template, self.params, self.returnType, self.declaredType))
+
+	def __repr__(self):
+		return 'FuncDef({!r}, {!r}, {!r})'.format(self.template, self.params, self.returnType)
+
+	def toDict(self, withDeclaredType=False):
+		funcDef = {
+			'template': self.template,
+			'params': [param.toDict() for param in self.params],
+			'returnType': self.returnType
+		}
+		if withDeclaredType:
+			funcDef['declaredType'] = self.declaredType
+		return funcDef
+
+	@classmethod
+	def fromDict(cls, funcDef):
+		return cls(funcDef['template'], [Param.fromDict(param) for param in funcDef['params']], funcDef['returnType'],
+			funcDef.get('declaredType'))
+
+def membersToDicts(members):
+	# class data: member name -> list of function definitions, or None for variables;
+	# with the declared types, as used by the class stream
+	return dict((name, [funcDef.toDict(withDeclaredType=True) for funcDef in funcDefs] if funcDefs is not None else None)
+		for name, funcDefs in members.iteritems())
+
+def membersFromDicts(members):
+	return dict((internString(name), [FuncDef.fromDict(funcDef) for funcDef in funcDefs] if funcDefs is not None else None)
+		for name, funcDefs in members.iteritems())
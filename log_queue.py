@@ -0,0 +1,57 @@
+import logging
+import threading
+
+class QueueHandler(logging.Handler):
+	"""Puts log records in a queue, to be handled by a QueueListener on a background thread."""
+
+	def __init__(self, queue):
+		logging.Handler.__init__(self)
+		self.queue = queue
+
+	def prepare(self, record):
+		# merge the arguments into the message now, as they may be modified before the record is handled
+		record.msg = record.getMessage()
+		record.args = None
+		record.exc_info = None
+		return record
+
+	def emit(self, record):
+		try:
+			if record.exc_info:
+				# the traceback can only be formatted in this thread
+				record.exc_text = logging.Formatter().formatException(record.exc_info)
+			self.queue.put_nowait(self.prepare(record))
+		except Exception:
+			self.handleError(record)
+
+class QueueListener(object):
+	"""Passes log records from a queue to the given handlers, on a background thread."""
+
+	_sentinel = None
+
+	def __init__(self, queue, *handlers):
+		self.queue = queue
+		self.handlers = handlers
+		self.thread = None
+
+	def start(self):
+		self.thread = threading.Thread(target=self.run)
+		self.thread.daemon = True
+		self.thread.start()
+
+	def run(self):
+		while True:
+			record = self.queue.get()
+			if record is self._sentinel:
+				break
+			for handler in self.handlers:
+				if record.levelno >= handler.level:
+					handler.handle(record)
+
+	def stop(self):
+		if self.thread:
+			self.queue.put_nowait(self._sentinel)
+			self.thread.join()
+			self.thread = None
+			for handler in self.handlers:
+				handler.flush()
@@ -0,0 +1,128 @@
+import os
+import hashlib
+import pickle
+
+class Manifest(object):
+	"""Records the documentation pages each class was read from, so unchanged classes can be reused.
+
+	Pages are identified by their path relative to the reference directory.
+	A page whose mtime and size match the previous manifest is assumed unchanged; otherwise it is hashed.
+	"""
+
+	# 2: function definitions are pickled as func_model records
+	# 3: function definitions keep the type preceding the name in C# signatures (FuncDef.declaredType)
+	# 4: classes record the fix-ups for them and those they matched
+	VERSION = 4
+
+	def __init__(self, refDir, previous=None):
+		self.refDir = refDir
+		self.previousPages = previous['pages'] if previous else {}
+		self.previousClasses = previous['classes'] if previous else {}
+		# relative path -> (mtime, size, sha1) or None for missing pages
+		self.pages = {}
+		# class link -> dict(section, name, pages=[(relative path, sha1)], data=pickled class data,
+		# fixups=the class's function definition fix-ups, fixupsMatched=keys of the fix-ups matched while reading it)
+		self.classes = {}
+
+	@classmethod
+	def load(cls, filename, refDir):
+		previous = None
+		if os.path.isfile(filename):
+			previous = pickle.load(open(filename, 'rb'))
+			if previous.get('version') != cls.VERSION:
+				previous = None
+		return cls(refDir, previous)
+
+	@classmethod
+	def fromOther(cls, other, refDir):
+		# reuses the classes recorded for another documentation directory (e.g. of another Unity version);
+		# mtimes say nothing about the pages of a different directory, so every page is hashed
+		return cls(refDir, {'pages': {}, 'classes': other.classes})
+
+	def save(self, filename):
+		pages = {}
+		for entry in self.classes.itervalues():
+			for relPath, _sha1 in entry['pages']:
+				pages[relPath] = self.pages[relPath]
+		manifest = {
+			'version': self.VERSION,
+			'pages': pages,
+			'classes': self.classes
+		}
+		pickle.dump(manifest, open(filename, 'wb'), pickle.HIGHEST_PROTOCOL)
+
+	@property
+	def hasPrevious(self):
+		return bool(self.previousClasses)
+
+	def getRelPath(self, filename):
+		return os.path.relpath(filename, self.refDir)
+
+	def getPageInfo(self, relPath):
+		if relPath not in self.pages:
+			self.pages[relPath] = self.statPage(relPath)
+		return self.pages[relPath]
+
+	def statPage(self, relPath):
+		filename = os.path.join(self.refDir, relPath)
+		try:
+			st = os.stat(filename)
+		except OSError:
+			return None
+		previousInfo = self.previousPages.get(relPath)
+		if previousInfo and previousInfo[0] == st.st_mtime and previousInfo[1] == st.st_size:
+			return previousInfo
+		sha1 = hashlib.sha1(open(filename, 'rb').read()).hexdigest()
+		return (st.st_mtime, st.st_size, sha1)
+
+	def getPageHash(self, relPath):
+		info = self.getPageInfo(relPath)
+		return info[2] if info else None
+
+	def isClassUnchanged(self, classLink, classFixups):
+		entry = self.previousClasses.get(classLink.link)
+		if entry is None or entry['section'] != classLink.sectionName or entry['name'] != classLink.name:
+			return False
+		if entry['fixups'] != classFixups:
+			return False
+		for relPath, sha1 in entry['pages']:
+			if self.getPageHash(relPath) != sha1:
+				return False
+		return True
+
+	def loadUnchangedClass(self, classLink):
+		"""Returns the class data and the keys of the fix-ups matched when it was read."""
+		entry = self.previousClasses[classLink.link]
+		self.classes[classLink.link] = entry
+		return pickle.loads(entry['data']), entry['fixupsMatched']
+
+	def recordClass(self, classLink, classData, filenames, classFixups, fixupsMatched):
+		relPaths = sorted(set(self.getRelPath(filename) for filename in filenames))
+		pages = [(relPath, self.getPageHash(relPath)) for relPath in relPaths]
+		self.addClass(classLink, classData, pages, classFixups, fixupsMatched)
+
+	def addClass(self, classLink, classData, pages, classFixups, fixupsMatched):
+		self.classes[classLink.link] = {
+			'section': classLink.sectionName,
+			'name': classLink.name,
+			'pages': pages,
+			# pickled now, since the class data may be modified later (see addUndocumented)
+			'data': pickle.dumps(classData, pickle.HIGHEST_PROTOCOL),
+			'fixups': classFixups,
+			'fixupsMatched': fixupsMatched
+		}
+
+	def getStreamRecord(self, classLink):
+		"""Returns what recordStreamedClass needs of a class recorded in this crawl, for the class stream (JSON)."""
+		entry = self.classes[classLink.link]
+		return {'pages': entry['pages'], 'fixups': entry['fixups'], 'fixupsMatched': entry['fixupsMatched']}
+
+	def recordStreamedClass(self, classLink, classData, record):
+		# records a class written to the class stream by an interrupted crawl; JSON turned the tuples into lists
+		pages = [tuple(page) for page in record['pages']]
+		for relPath, _sha1 in pages:
+			# the hash the class was read with is kept, so that a page changed since makes the class changed
+			self.getPageInfo(relPath)
+		self.addClass(classLink, classData, pages,
+			[(tuple(key), funcDef) for key, funcDef in record['fixups']],
+			[tuple(key) if isinstance(key, list) else key for key in record['fixupsMatched']])
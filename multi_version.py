@@ -0,0 +1,172 @@
+#!/usr/bin/python
+"""Crawled data of several Unity versions in a single deduplicated dataset, and API diffs between versions.
+
+The dataset is a pickle of a dictionary with the keys:
+
+* "versions" - List of version names, in crawl order
+* "classes" - Dictionary by section, then by class name, of dictionaries with the keys
+	* "versions" - Tuple of the versions in which the class appears
+	* "members" - Dictionary by class member name of the members with the same definitions in all of the class's versions.
+	  Definitions are lists or None, as in the single-version pickle.
+	* "variants" - Dictionary by class member name of the other members, each a list of (versions, definitions) tuples
+
+Equal tuples of versions, definitions and strings are stored once.
+
+Usage: multi_version.py DATASET VERSION_A VERSION_B, prints the members added, removed and changed in VERSION_B.
+"""
+import pickle
+import argparse
+import canonical_pickle
+
+class VersionedDataset(object):
+	def __init__(self, versions=None, classes=None):
+		self.versions = versions or []
+		# section -> class name -> dict(versions=[version], members={member name: [dict(versions=[version], definitions)]})
+		self.classes = classes or {}
+
+	@classmethod
+	def load(cls, filename):
+		dataset = pickle.load(open(filename, 'rb'))
+		classes = {}
+		for sectionName, classData in dataset['classes'].iteritems():
+			versionedClassData = classes[sectionName] = {}
+			for className, storedClass in classData.iteritems():
+				members = dict((memberName, [{'versions': list(storedClass['versions']), 'definitions': funcDefs}])
+					for memberName, funcDefs in storedClass['members'].iteritems())
+				for memberName, variants in storedClass['variants'].iteritems():
+					members[memberName] = [{'versions': list(versions), 'definitions': funcDefs} for versions, funcDefs in variants]
+				versionedClassData[className] = {'versions': list(storedClass['versions']), 'members': members}
+		return cls(dataset['versions'], classes)
+
+	def save(self, filename):
+		# dicts built in sorted key order, so the pickle does not depend on the order versions were added in
+		versionTuples = {}
+		classes = {}
+		for sectionName in sorted(self.classes):
+			classData = classes[sectionName] = {}
+			for className in sorted(self.classes[sectionName]):
+				versionedClass = self.classes[sectionName][className]
+				classVersions = versionTuples.setdefault(tuple(versionedClass['versions']), tuple(versionedClass['versions']))
+				members = {}
+				variants = {}
+				for memberName in sorted(versionedClass['members']):
+					memberVariants = versionedClass['members'][memberName]
+					if len(memberVariants) == 1 and tuple(memberVariants[0]['versions']) == classVersions:
+						members[memberName] = memberVariants[0]['definitions']
+					else:
+						variants[memberName] = [(versionTuples.setdefault(tuple(variant['versions']), tuple(variant['versions'])), variant['definitions'])
+							for variant in memberVariants]
+				classData[className] = {'versions': classVersions, 'members': members, 'variants': variants}
+		canonical_pickle.dump({'versions': self.versions, 'classes': classes}, filename)
+
+	def add(self, version, classDataBySection):
+		"""Adds a version's data, in the single-version format.
+
+		Equal definitions are compared by identity first, so sharing them (see ScriptReferenceReader.canonicalize
+		and crawl.py --share-records) makes adding similar versions cheaper.
+		"""
+		if version in self.versions:
+			raise Exception('Version added twice: {}'.format(version))
+		self.versions.append(version)
+		for sectionName, classData in classDataBySection.iteritems():
+			versionedClassData = self.classes.setdefault(sectionName, {})
+			for className, members in classData.iteritems():
+				versionedClass = versionedClassData.setdefault(className, {'versions': [], 'members': {}})
+				versionedClass['versions'].append(version)
+				for memberName, funcDefs in members.iteritems():
+					variants = versionedClass['members'].setdefault(memberName, [])
+					for variant in variants:
+						if variant['definitions'] is funcDefs or variant['definitions'] == funcDefs:
+							variant['versions'].append(version)
+							break
+					else:
+						variants.append({'versions': [version], 'definitions': funcDefs})
+
+	def checkVersion(self, version):
+		if version not in self.versions:
+			raise Exception('Unknown version: {} (versions: {})'.format(version, ', '.join(self.versions)))
+
+	@classmethod
+	def findVariant(cls, variants, version):
+		for variant in variants:
+			if version in variant['versions']:
+				return variant
+		return None
+
+	def getVersion(self, version):
+		"""Returns a version's data, in the single-version format."""
+		self.checkVersion(version)
+		classDataBySection = {}
+		for sectionName, classData in self.classes.iteritems():
+			versionClassData = classDataBySection[sectionName] = {}
+			for className, versionedClass in classData.iteritems():
+				if version not in versionedClass['versions']:
+					continue
+				members = versionClassData[className] = {}
+				for memberName, variants in versionedClass['members'].iteritems():
+					variant = self.findVariant(variants, version)
+					if variant:
+						members[memberName] = variant['definitions']
+		return classDataBySection
+
+	def diff(self, versionA, versionB):
+		"""Returns the (section, class, member) tuples added, removed and changed from versionA to versionB.
+
+		Member is None for classes added or removed as a whole.
+		Definitions are only compared when adding versions, so a member is changed when its variants differ.
+		"""
+		self.checkVersion(versionA)
+		self.checkVersion(versionB)
+		added = []
+		removed = []
+		changed = []
+		for sectionName in sorted(self.classes):
+			classData = self.classes[sectionName]
+			for className in sorted(classData):
+				versionedClass = classData[className]
+				inA = versionA in versionedClass['versions']
+				inB = versionB in versionedClass['versions']
+				if not (inA and inB):
+					if inA:
+						removed.append((sectionName, className, None))
+					elif inB:
+						added.append((sectionName, className, None))
+					continue
+				for memberName in sorted(versionedClass['members']):
+					variants = versionedClass['members'][memberName]
+					variantA = self.findVariant(variants, versionA)
+					variantB = self.findVariant(variants, versionB)
+					if variantA is variantB:
+						continue
+					elif variantA is None:
+						added.append((sectionName, className, memberName))
+					elif variantB is None:
+						removed.append((sectionName, className, memberName))
+					else:
+						changed.append((sectionName, className, memberName))
+		return {
+			'added': added,
+			'removed': removed,
+			'changed': changed
+		}
+
+def formatDiff(diff):
+	lines = []
+	for kind, mark in (('added', '+'), ('removed', '-'), ('changed', '~')):
+		for sectionName, className, memberName in diff[kind]:
+			lines.append('{} {}: {}'.format(mark, sectionName, className if memberName is None else className + '.' + memberName))
+	return '\n'.join(lines)
+
+def main():
+	parser = argparse.ArgumentParser(description='Prints the API changes between two versions of a multi-version dataset.')
+	parser.add_argument('dataset', help='dataset written by crawl.py --versions')
+	parser.add_argument('versionA', help='old version')
+	parser.add_argument('versionB', help='new version')
+	args = parser.parse_args()
+	dataset = VersionedDataset.load(args.dataset)
+	diff = dataset.diff(args.versionA, args.versionB)
+	print formatDiff(diff)
+	print '{} added, {} removed, {} changed'.format(len(diff['added']), len(diff['removed']), len(diff['changed']))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,60 @@
+DEFAULT_MAX_PAGES = 64
+
+import os
+import hashlib
+from collections import OrderedDict
+from page_reader import readContent, parseContent
+from crawl_stats import stats
+
+class PageCache(object):
+	def __init__(self, maxPages=DEFAULT_MAX_PAGES, byContent=False, prefetcher=None):
+		self.maxPages = maxPages
+		# reads pages ahead, if given
+		self.prefetcher = prefetcher
+		# with byContent, extracted function definitions are keyed by page contents rather than path,
+		# so that identical pages of different documentation directories are extracted once
+		self.byContent = byContent
+		# content hashes by resolved path
+		self.contentKeys = {}
+		# parsed content sections by resolved path, least recently used first
+		self.pages = OrderedDict()
+		# extracted (funcDef, paramNames) lists by (resolved path or content hash, funcName)
+		self.funcDefs = {}
+
+	@classmethod
+	def resolvePath(cls, filename):
+		return os.path.normcase(os.path.realpath(filename))
+
+	def getPageKey(self, filename):
+		key = self.resolvePath(filename)
+		if self.byContent:
+			contentKey = self.contentKeys.get(key)
+			if contentKey is None:
+				with stats.timer('hash file'):
+					contentKey = self.contentKeys[key] = hashlib.sha1(open(filename, 'rb').read()).hexdigest()
+			return contentKey
+		return key
+
+	def getPage(self, filename):
+		key = self.resolvePath(filename)
+		page = self.pages.pop(key, None)
+		if page is None:
+			stats.count('pageCache.pageMisses')
+			page = parseContent(self.prefetcher.read(filename) if self.prefetcher else readContent(filename))
+			if len(self.pages) >= self.maxPages:
+				self.pages.popitem(last=False)
+		else:
+			stats.count('pageCache.pageHits')
+		self.pages[key] = page
+		return page
+
+	def getFuncDefs(self, filename, funcName, extract):
+		key = (self.getPageKey(filename), funcName)
+		funcDefs = self.funcDefs.get(key)
+		if funcDefs is None:
+			stats.count('pageCache.funcDefMisses')
+			funcDefs = list(extract(filename, funcName))
+			self.funcDefs[key] = funcDefs
+		else:
+			stats.count('pageCache.funcDefHits')
+		return funcDefs
@@ -0,0 +1,91 @@
+"""Reading and parsing of documentation pages.
+
+Only the content section of a page is parsed: the bytes from the section's start tag to the end of the page
+are handed to the parser, skipping the head, header and sidebar of the page. The parser closes the section
+where it would in the whole page, so its content is the same as the one CONTENT_SECTION_XPATH finds there.
+The start tag is only used if it directly follows the content div's and is not in a comment or script,
+if no div before it has a "section" class, and if the fragment parses to the section followed by the rest of the page.
+Pages failing any of these checks are parsed whole.
+Files are read rather than memory-mapped: mapping files of this size is slower than reading them (see benchmarks/bench_extract.py).
+"""
+import re
+from lxml import html
+from lxml import etree
+from crawl_stats import stats
+
+CONTENT_START = '<div class="section">'
+# the section's start tag, directly inside the content div
+CONTENT_START_RE = re.compile(r'<div class="content">\s*(' + re.escape(CONTENT_START) + ')')
+CONTENT_SECTION_XPATH = etree.XPath('.//div[@class="content"]/div[@class="section"]')
+PAGE_PARSER = html.HTMLParser()
+# the content section lacks the page's charset declaration
+FRAGMENT_PARSER = html.HTMLParser(encoding='utf-8')
+# start and end of elements whose text is not parsed as tags
+RAW_TEXT_DELIMITERS = [('<!--', '-->'), ('<script', '</script'), ('<style', '</style')]
+
+class PageContent(object):
+	"""A page, and the position of its content section's start tag in it (None if it was not found)."""
+	__slots__ = ('data', 'start')
+
+	def __init__(self, data, start):
+		self.data = data
+		self.start = start
+
+def readFile(filename):
+	with open(filename, 'rb') as f:
+		return f.read()
+
+def readContent(filename):
+	"""Returns a PageContent of a page."""
+	with stats.timer('read file'):
+		data = readFile(filename)
+	return extractContent(data)
+
+def extractContent(data):
+	# safe to call on any thread, unlike the other functions, which record stats
+	m = CONTENT_START_RE.search(data)
+	if not m or isInRawText(data, m.start()) or hasSectionDiv(data, m.start(1)):
+		return PageContent(data, None)
+	return PageContent(data, m.start(1))
+
+def isInRawText(data, pos):
+	for start, end in RAW_TEXT_DELIMITERS:
+		startPos = data.rfind(start, 0, pos)
+		if startPos != -1 and data.find(end, startPos, pos) == -1:
+			return True
+	return False
+
+def hasSectionDiv(data, end):
+	# whether a div start tag before end has "section" in it, e.g. a section with other attributes, which the XPath would find first
+	pos = data.find('section', 0, end)
+	while pos != -1:
+		tagStart = data.rfind('<', 0, pos)
+		if data[tagStart + 1:tagStart + 4].lower() == 'div' and data.find('>', tagStart, pos) == -1 and not isInRawText(data, tagStart):
+			return True
+		pos = data.find('section', pos + 1, end)
+	return False
+
+def parseContent(content):
+	"""Returns the content section element of a PageContent, or the page's root element if it has none."""
+	if content.start is not None:
+		with stats.timer('parse html'):
+			root = etree.fromstring(content.data[content.start:], FRAGMENT_PARSER)
+		section = getFragmentSection(root)
+		if section is not None:
+			return section
+		stats.count('pages.fragmentMismatches')
+	stats.count('pages.wholePages')
+	with stats.timer('parse html'):
+		root = etree.fromstring(content.data, PAGE_PARSER)
+	sections = CONTENT_SECTION_XPATH(root)
+	return sections[0] if sections else root
+
+def getFragmentSection(root):
+	# the section must be the fragment's first element, as its start tag was
+	body = root.find('body')
+	if body is None or not len(body) or (body.text or '').strip():
+		return None
+	section = body[0]
+	if section.tag != 'div' or section.get('class') != 'section':
+		return None
+	return section
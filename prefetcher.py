@@ -0,0 +1,110 @@
+DEFAULT_NUM_THREADS = 4
+
+import time
+import Queue
+import threading
+from itertools import count
+import page_reader
+from crawl_stats import stats
+
+# pages needed by the current class are read before those of upcoming classes
+URGENT = 0
+AHEAD = 1
+
+class Prefetcher(object):
+	"""Reads pages on background threads, ahead of the thread parsing them.
+
+	Scheduled pages are held until read() takes them, or until they are discarded.
+	Each page is scheduled once at most, so pages read or scheduled before are skipped.
+	The buffer is bounded by what the caller schedules, see ScriptReferenceReader.iterReadClassesUnrecorded.
+	"""
+
+	def __init__(self, numThreads=DEFAULT_NUM_THREADS):
+		self.numThreads = numThreads
+		self.queue = Queue.PriorityQueue()
+		self.sequence = count()
+		self.condition = threading.Condition()
+		# filename -> (content, error) once read, or None while pending, for scheduled pages not taken yet
+		self.pages = {}
+		# filenames scheduled or read
+		self.seen = set()
+		self.threads = []
+
+	def start(self):
+		for _i in xrange(self.numThreads):
+			thread = threading.Thread(target=self.run)
+			thread.daemon = True
+			thread.start()
+			self.threads.append(thread)
+
+	def schedule(self, filenames, priority=AHEAD):
+		with self.condition:
+			for filename in filenames:
+				if filename in self.seen:
+					continue
+				self.seen.add(filename)
+				self.pages[filename] = None
+				self.queue.put((priority, next(self.sequence), filename))
+		if not self.threads:
+			self.start()
+
+	def run(self):
+		while True:
+			_priority, _sequence, filename = self.queue.get()
+			if filename is None:
+				break
+			with self.condition:
+				if filename not in self.pages:
+					# discarded before being read
+					continue
+			start = time.time()
+			try:
+				result = (page_reader.extractContent(page_reader.readFile(filename)), None)
+			except Exception, e:
+				result = (None, e)
+			seconds = time.time() - start
+			with self.condition:
+				stats.addTime('prefetch read', seconds)
+				if filename in self.pages:
+					self.pages[filename] = result
+					self.condition.notify_all()
+
+	def read(self, filename):
+		"""Returns the content of a page, as page_reader.readContent does, waiting for it if it is being read."""
+		with self.condition:
+			if filename not in self.pages:
+				self.seen.add(filename)
+				stats.count('prefetch.misses')
+				result = None
+			else:
+				stats.sample('prefetch.queueDepth', len(self.pages))
+				if self.pages[filename] is None:
+					stats.count('prefetch.waits')
+					with stats.timer('prefetch wait'):
+						while self.pages[filename] is None:
+							self.condition.wait()
+				else:
+					stats.count('prefetch.hits')
+				result = self.pages.pop(filename)
+		if result is None:
+			return page_reader.readContent(filename)
+		content, error = result
+		if error:
+			raise error
+		return content
+
+	def discard(self, filenames):
+		# pages scheduled but not needed after all
+		with self.condition:
+			for filename in filenames:
+				if self.pages.pop(filename, False) is not False:
+					stats.count('prefetch.unused')
+
+	def close(self):
+		with self.condition:
+			self.pages.clear()
+		for _thread in self.threads:
+			self.queue.put((AHEAD + 1, next(self.sequence), None))
+		for thread in self.threads:
+			thread.join()
+		self.threads = []
@@ -0,0 +1,96 @@
+"""Search index over the crawled data: name prefix completion and reverse lookup by type.
+
+The index is a block file (see block_file) with three blocks:
+
+* Names: lowercase key, name, kind ("class" or "member"), section, class, member.
+  Members are listed by their own name and by "class.member".
+* Returns: return type, section, class, member
+* Accepts: parameter type (without out/ref/params), section, class, member, parameter name
+
+Return types are those following the parameters (e.g. "function Foo(x) : Type"), or for C# signatures, which end with ";",
+the types preceding the function name, given to the writer apart from the data (see getReturnType()).
+
+Queries bisect the sorted lines of the blocks.
+"""
+import re
+import bisect
+from block_file import joinFields, writeBlocks, readBlocks
+
+MAGIC = 'USIDX1'
+DEFAULT_LIMIT = 50
+PARAM_TYPE_MODIFIERS = ('out ', 'ref ', 'params ')
+# a type name, as opposed to the ";" ending C# signatures
+RETURN_TYPE_RE = re.compile(r'^[\w\.,<>\[\]]+$')
+
+class SearchIndexWriter(object):
+	def write(self, filename, classDataBySection, declaredTypes=None):
+		"""declaredTypes is a dictionary by section, class and function of the types preceding the name
+		in each of the function's definitions, or None for constructors and other signatures."""
+		names = []
+		returns = []
+		accepts = []
+		for sectionName, classData in classDataBySection.items():
+			for className, members in classData.items():
+				names.append(joinFields(className.lower(), className, 'class', sectionName, className, ''))
+				for memberName, funcDefs in members.items():
+					names.append(joinFields(memberName.lower(), memberName, 'member', sectionName, className, memberName))
+					qualifiedName = className + '.' + memberName
+					names.append(joinFields(qualifiedName.lower(), qualifiedName, 'member', sectionName, className, memberName))
+					for funcDef, declaredType in iterWithDeclaredTypes(funcDefs, declaredTypes, sectionName, className, memberName):
+						returnType = getReturnType(funcDef, declaredType)
+						if returnType:
+							returns.append(joinFields(returnType, sectionName, className, memberName))
+						for param in funcDef['params']:
+							accepts.append(joinFields(normalizeParamType(param['type']), sectionName, className, memberName, param['name'] or ''))
+		writeBlocks(filename, MAGIC, (names, returns, accepts))
+
+def iterWithDeclaredTypes(funcDefs, declaredTypes, sectionName, className, memberName):
+	if funcDefs is None:
+		return iter(())
+	if declaredTypes is None:
+		return ((funcDef, None) for funcDef in funcDefs)
+	return zip(funcDefs, declaredTypes[sectionName][className][memberName])
+
+def getReturnType(funcDef, declaredType=None):
+	"""Returns the return type of a function definition in the pickle's format, or None (e.g. for constructors)."""
+	returnType = funcDef['returnType']
+	if returnType is not None and RETURN_TYPE_RE.match(returnType):
+		return returnType
+	return declaredType
+
+def normalizeParamType(type_):
+	for modifier in PARAM_TYPE_MODIFIERS:
+		if type_.startswith(modifier):
+			return type_[len(modifier):]
+	return type_
+
+class SearchIndex(object):
+	def __init__(self, filename):
+		self.names, self.returns, self.accepts = readBlocks(filename, MAGIC, 'search index')
+
+	@classmethod
+	def iterPrefix(cls, lines, prefix):
+		for i in range(bisect.bisect_left(lines, prefix), len(lines)):
+			if not lines[i].startswith(prefix):
+				break
+			yield lines[i].split(u'\t')
+
+	def complete(self, prefix, limit=DEFAULT_LIMIT):
+		"""Returns up to limit (name, kind, section, class, member) tuples whose name starts with prefix, ignoring case.
+
+		A prefix containing a dot, e.g. "Transform.Ro", matches class members.
+		"""
+		results = []
+		for fields in self.iterPrefix(self.names, prefix.lower()):
+			if len(results) >= limit:
+				break
+			results.append(tuple(fields[1:]))
+		return results
+
+	def whoReturns(self, typeName):
+		"""Returns (section, class, member) tuples of the functions returning typeName (e.g. "Transform" or "Transform[]")."""
+		return sorted(set(tuple(fields[1:]) for fields in self.iterPrefix(self.returns, typeName + u'\t')))
+
+	def whoAccepts(self, typeName):
+		"""Returns (section, class, member, parameter name) tuples of the functions with a typeName parameter."""
+		return [tuple(fields[1:]) for fields in self.iterPrefix(self.accepts, normalizeParamType(typeName) + u'\t')]
@@ -0,0 +1,91 @@
+"""Tests of --stream and --resume: a resumed crawl writes the same output as an uninterrupted one."""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+from crawl import ScriptReferenceReader
+from class_stream import ClassStreamWriter, iterClassStream
+from crawl_stats import stats
+from gen_synthetic_docs import SyntheticDocs
+
+NUM_CLASSES = 15
+NUM_WRITTEN = 6
+
+class ResumeTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.tempDir = tempfile.mkdtemp(prefix='unity-stream-test-')
+		cls.docsDir = os.path.join(cls.tempDir, 'docs')
+		SyntheticDocs(cls.docsDir, numClasses=NUM_CLASSES, seed=5).generate()
+
+	@classmethod
+	def tearDownClass(cls):
+		shutil.rmtree(cls.tempDir)
+
+	def setUp(self):
+		self.streamFilename = os.path.join(self.tempDir, 'unity.jsonl')
+
+	def crawl(self, output, **kwargs):
+		# returns the pickle's bytes and the number of classes read
+		stats.reset()
+		reader = ScriptReferenceReader(baseDir=self.docsDir, **kwargs)
+		reader.read()
+		filename = os.path.join(self.tempDir, output)
+		reader.save(filename)
+		with open(filename, 'rb') as f:
+			return f.read(), stats.timers['readClass'][0] if 'readClass' in stats.timers else 0
+
+	def interrupt(self, numLines, partialLine=True):
+		# keeps the classes written first, and the start of the next one, as left by a crawl that died
+		with open(self.streamFilename, 'rb') as f:
+			lines = f.readlines()
+		with open(self.streamFilename, 'wb') as f:
+			f.writelines(lines[:numLines])
+			if partialLine:
+				f.write(lines[numLines][:len(lines[numLines]) // 2])
+
+	def testStream(self):
+		expected, numRead = self.crawl('expected.pkl')
+		self.assertEqual(numRead, NUM_CLASSES)
+		self.assertEqual(self.crawl('streamed.pkl', streamFilename=self.streamFilename)[0], expected)
+		self.assertEqual(len(list(iterClassStream(self.streamFilename))), NUM_CLASSES)
+
+	def testResume(self):
+		expected, _numRead = self.crawl('expected.pkl')
+		self.crawl('interrupted.pkl', streamFilename=self.streamFilename)
+		self.interrupt(NUM_WRITTEN)
+		resumed, numRead = self.crawl('resumed.pkl', streamFilename=self.streamFilename, resume=True)
+		self.assertEqual(numRead, NUM_CLASSES - NUM_WRITTEN)
+		self.assertEqual(resumed, expected)
+		# the partial line was replaced, and no class written twice
+		links = [record['link'] for record in iterClassStream(self.streamFilename)]
+		self.assertEqual(len(links), NUM_CLASSES)
+		self.assertEqual(len(set(links)), NUM_CLASSES)
+
+	def testResumeFinished(self):
+		expected = self.crawl('expected.pkl', streamFilename=self.streamFilename)[0]
+		self.assertEqual(self.crawl('resumed.pkl', streamFilename=self.streamFilename, resume=True), (expected, 0))
+
+	def testWithoutResume(self):
+		self.crawl('interrupted.pkl', streamFilename=self.streamFilename)
+		self.interrupt(NUM_WRITTEN)
+		# the file is written again from the start
+		self.assertEqual(self.crawl('full.pkl', streamFilename=self.streamFilename)[1], NUM_CLASSES)
+		self.assertEqual(len(list(iterClassStream(self.streamFilename))), NUM_CLASSES)
+
+	def testTruncatePartialLine(self):
+		with open(self.streamFilename, 'wb') as f:
+			f.write('{"link":"A"}\n{"link":"B"}\n{"li')
+		writer = ClassStreamWriter(self.streamFilename, resume=True)
+		writer.close()
+		self.assertEqual(writer.writtenLinks, set(['A', 'B']))
+		with open(self.streamFilename, 'rb') as f:
+			self.assertEqual(f.read(), '{"link":"A"}\n{"link":"B"}\n')
+
+if __name__ == '__main__':
+	unittest.main()
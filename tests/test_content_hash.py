@@ -0,0 +1,129 @@
+"""Tests of reproducible output: content hashes and canonical pickles depend on the data only."""
+import os
+import sys
+import copy
+import pickle
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+import canonical_pickle
+from content_hash import ContentHashes, hashCanonical, HASH_VERSION
+
+MEMBERS = {
+	'Rotate': [{'template': None, 'params': [{'name': 'eulers', 'type': 'Vector3', 'default': None}], 'returnType': ';'}],
+	'position': None
+}
+# the hash of MEMBERS; if it changes, so must HASH_VERSION
+MEMBERS_HASH = '26d7cca1eeb82ea70865bfca00760bffc4748c8d'
+
+# pickles a dict built in the order given on the command line
+DUMP_SCRIPT = '''
+import sys
+sys.path.insert(0, sys.argv[1])
+import canonical_pickle
+keys = ['key{}'.format(i) for i in range(200)]
+if sys.argv[3] == 'reversed':
+	keys.reverse()
+canonical_pickle.dump(dict((key, [key, {key: len(key), key.upper(): None}]) for key in keys), sys.argv[2])
+'''
+
+def makeReordered(obj):
+	# an equal dictionary with a different insertion history, so possibly a different iteration order
+	if isinstance(obj, dict):
+		items = [(key, makeReordered(value)) for key, value in obj.items()]
+		reordered = dict((key + '-padding', None) for key, _value in items)
+		for key, value in reversed(items):
+			reordered[key] = value
+		for key, _value in items:
+			del reordered[key + '-padding']
+		return reordered
+	elif isinstance(obj, list):
+		return [makeReordered(item) for item in obj]
+	return obj
+
+class ContentHashTest(unittest.TestCase):
+	def setUp(self):
+		self.tempDir = tempfile.mkdtemp(prefix='unity-hash-test-')
+
+	def tearDown(self):
+		shutil.rmtree(self.tempDir)
+
+	def testStableHash(self):
+		self.assertEqual(hashCanonical(MEMBERS), MEMBERS_HASH)
+		self.assertEqual(hashCanonical(makeReordered(MEMBERS)), MEMBERS_HASH)
+		# unicode strings, as read back from JSON, hash the same
+		unicodeMembers = {u'Rotate': [{u'template': None, u'params': [{u'name': u'eulers', u'type': u'Vector3', u'default': None}],
+			u'returnType': u';'}], u'position': None}
+		self.assertEqual(hashCanonical(unicodeMembers), MEMBERS_HASH)
+
+	def testChangedClasses(self):
+		changedMembers = dict(MEMBERS, position=[])
+		old = ContentHashes.compute({'Runtime Classes': {'Transform': MEMBERS, 'Removed': {}}, 'Editor Classes': {'Editor': MEMBERS}})
+		new = ContentHashes.compute({'Runtime Classes': {'Transform': changedMembers, 'Added': {}}, 'Editor Classes': {'Editor': MEMBERS}})
+		self.assertNotEqual(new.datasetHash, old.datasetHash)
+		self.assertEqual(new.getChangedClasses(old), [('Runtime Classes', 'Added'), ('Runtime Classes', 'Removed'), ('Runtime Classes', 'Transform')])
+		self.assertEqual(new.getClassHash('Editor', 'Editor Classes'), old.getClassHash('Editor', 'Editor Classes'))
+		self.assertEqual(new.getChangedClasses(new), [])
+
+	def testSaveLoad(self):
+		hashes = ContentHashes.compute({'Runtime Classes': {'Transform': MEMBERS}})
+		filename = os.path.join(self.tempDir, 'unity.hashes')
+		hashes.save(filename)
+		loaded = ContentHashes.load(filename)
+		self.assertEqual(loaded.datasetHash, hashes.datasetHash)
+		self.assertEqual(loaded.getChangedClasses(hashes), [])
+		# saved the same way twice
+		otherFilename = os.path.join(self.tempDir, 'other.hashes')
+		ContentHashes.compute(makeReordered({'Runtime Classes': {'Transform': MEMBERS}})).save(otherFilename)
+		self.assertEqual(open(otherFilename, 'rb').read(), open(filename, 'rb').read())
+
+	def testOtherVersion(self):
+		filename = os.path.join(self.tempDir, 'unity.hashes')
+		with open(filename, 'wb') as f:
+			f.write('{"version":%d,"dataset":"x","classes":{"Runtime Classes":{"Transform":"y"}}}' % (HASH_VERSION + 1))
+		loaded = ContentHashes.load(filename)
+		self.assertIsNone(loaded.datasetHash)
+		# every class counts as changed
+		self.assertEqual(ContentHashes.compute({'Runtime Classes': {'Transform': MEMBERS}}).getChangedClasses(loaded), [('Runtime Classes', 'Transform')])
+
+class CanonicalPickleTest(unittest.TestCase):
+	def setUp(self):
+		self.tempDir = tempfile.mkdtemp(prefix='unity-pickle-test-')
+
+	def tearDown(self):
+		shutil.rmtree(self.tempDir)
+
+	def dump(self, obj, name):
+		filename = os.path.join(self.tempDir, name)
+		canonical_pickle.dump(obj, filename)
+		with open(filename, 'rb') as f:
+			return f.read()
+
+	def testInsertionOrder(self):
+		# copies, as objects are written once however often they are referenced
+		data = {'Runtime Classes': dict(('Class{}'.format(i), copy.deepcopy(MEMBERS)) for i in xrange(50))}
+		self.assertEqual(self.dump(makeReordered(data), 'b.pkl'), self.dump(data, 'a.pkl'))
+		self.assertEqual(pickle.loads(self.dump(data, 'a.pkl')), data)
+
+	def testProtocol(self):
+		# pinned, rather than the highest protocol of the running Python
+		self.assertEqual(self.dump(MEMBERS, 'a.pkl')[:2], '\x80\x02')
+
+	def testHashRandomization(self):
+		# the same bytes in processes with different string hashes and insertion orders
+		outputs = []
+		for i, order in enumerate(('forward', 'reversed', 'forward')):
+			filename = os.path.join(self.tempDir, '{}.pkl'.format(i))
+			env = dict(os.environ, PYTHONHASHSEED=str(i + 1))
+			subprocess.check_call([sys.executable, '-c', DUMP_SCRIPT, ROOT_DIR, filename, order], env=env)
+			with open(filename, 'rb') as f:
+				outputs.append(f.read())
+		self.assertEqual(outputs[1], outputs[0])
+		self.assertEqual(outputs[2], outputs[0])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,87 @@
+"""Tests of ExampleIndex: parameter names from example code, as found by searching the example for each function."""
+import os
+import sys
+import random
+import unittest
+from lxml import html
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from crawl import ScriptReferenceReader
+from crawl_stats import stats
+
+ExampleIndex = ScriptReferenceReader.ExampleIndex
+
+EXAMPLE = ('using UnityEngine;'
+	'public class Example : MonoBehaviour{'
+	'    void Rotate(float angle, Space relativeTo)    {        transform.Rotate(0, angle, 0, relativeTo);    }'
+	'    void Rotate(float angle)    {    }'
+	'    static Vector3 Move(Transform target, int steps)    {        return target.position * steps;    }'
+	'    void Start()    {        Rotate(30.0f, Space.World);        Move(transform, 2);    }'
+	'    public static Example operator+(Example a, Example b)    {        return a;    }'
+	'}')
+
+def searchParamNames(example, funcName):
+	# the search ExampleIndex replaces: the first match of the name that is followed by a definition
+	reader = ScriptReferenceReader
+	for start, m in reader.iterFuncNameMatches(example, funcName, reader.EXAMPLE_FUNC_DEF_TAIL_RE):
+		if reader.isWordBoundary(example, start):
+			return [param.name for param in reader.parseFuncDef(example[start:m.end()], funcName).params]
+	return None
+
+class ExampleIndexTest(unittest.TestCase):
+	def setUp(self):
+		stats.reset()
+
+	def testParamNames(self):
+		index = ExampleIndex(EXAMPLE)
+		self.assertEqual(index.getParamNames('Move'), ['target', 'steps'])
+		self.assertEqual(index.getParamNames('Start'), [])
+		self.assertIsNone(index.getParamNames('Missing'))
+		# operators are not plain names, and are searched for
+		self.assertEqual(index.getParamNames('operator+'), ['a', 'b'])
+
+	def testFirstDefinition(self):
+		# the first overload
+		self.assertEqual(ExampleIndex(EXAMPLE).getParamNames('Rotate'), ['angle', 'relativeTo'])
+		# a call site before the definition is followed by a brace too, and taken for it, as with the search
+		example = EXAMPLE.replace('{    void Rotate(', '{    void Awake()    {        Move(transform, 1);    }    void Rotate(', 1)
+		self.assertNotEqual(example, EXAMPLE)
+		self.assertEqual(ExampleIndex(example).getParamNames('Move'), searchParamNames(example, 'Move'))
+		self.assertNotEqual(ExampleIndex(example).getParamNames('Move'), ['target', 'steps'])
+
+	def testSameAsSearch(self):
+		names = ['Start', 'Rotate', 'Move', 'Update', 'Find', 'operator+', 'position']
+		rand = random.Random(3)
+		fragments = EXAMPLE.replace('{', '{\0').replace('}', '}\0').replace(';', ';\0').split('\0')
+		for _i in xrange(200):
+			example = ''.join(rand.choice(fragments) for _j in xrange(rand.randint(1, 12)))
+			index = ExampleIndex(example)
+			for name in names:
+				try:
+					expected = searchParamNames(example, name)
+				except Exception:
+					# definitions the parser rejects; getParamNames raises too
+					self.assertRaises(Exception, index.getParamNames, name)
+					continue
+				self.assertEqual(index.getParamNames(name), expected, '{} in {!r}'.format(name, example))
+
+	def testCachedParamNames(self):
+		index = ExampleIndex(EXAMPLE)
+		paramNames = index.getParamNames('Move')
+		self.assertIs(index.getParamNames('Move'), paramNames)
+		self.assertEqual(stats.samples['exampleIndex.hitRate'][:2], [2, 2])
+
+	def testIndexPerExample(self):
+		# overloads of a page share the index of their example element
+		page = html.fromstring('<div><pre class="codeExampleCS">{}</pre></div>'.format(EXAMPLE))
+		exampleNode = page.xpath('pre')
+		exampleIndexes = {}
+		self.assertEqual(ScriptReferenceReader.getFunctionParamNamesFromExample(exampleNode, 'Rotate', exampleIndexes), ['angle', 'relativeTo'])
+		self.assertEqual(ScriptReferenceReader.getFunctionParamNamesFromExample(exampleNode, 'Move', exampleIndexes), ['target', 'steps'])
+		self.assertEqual(len(exampleIndexes), 1)
+		self.assertEqual(stats.counters['exampleIndex.examples'], 1)
+		self.assertIsNone(ScriptReferenceReader.getFunctionParamNamesFromExample([], 'Move', exampleIndexes))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,154 @@
+"""Tests of incremental crawls: classes are reused from the manifest unless their pages or fix-ups changed."""
+import os
+import sys
+import pickle
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+from crawl import ScriptReferenceReader
+from fixups import Fixups
+from manifest import Manifest
+from crawl_stats import stats
+from gen_synthetic_docs import SyntheticDocs
+
+NUM_CLASSES = 20
+FIXED_FUNC_DEF = 'Method0(Fixed value)'
+
+class RecordingReader(ScriptReferenceReader):
+	# remembers the classes read rather than reused
+	def __init__(self, *args, **kwargs):
+		ScriptReferenceReader.__init__(self, *args, **kwargs)
+		self.classesParsed = []
+
+	def readClass(self, classLink):
+		self.classesParsed.append(classLink.name)
+		return ScriptReferenceReader.readClass(self, classLink)
+
+class IncrementalTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.tempDir = tempfile.mkdtemp(prefix='unity-manifest-test-')
+		cls.docsDir = os.path.join(cls.tempDir, 'docs')
+		SyntheticDocs(cls.docsDir, numClasses=NUM_CLASSES, seed=3).generate()
+
+	@classmethod
+	def tearDownClass(cls):
+		shutil.rmtree(cls.tempDir)
+
+	def setUp(self):
+		self.manifestFilename = os.path.join(self.tempDir, 'test.manifest')
+		if os.path.exists(self.manifestFilename):
+			os.remove(self.manifestFilename)
+		stats.reset()
+
+	def crawl(self, funcDefs=(), **kwargs):
+		reader = RecordingReader(baseDir=self.docsDir, manifestFilename=self.manifestFilename, fixups=Fixups({}, list(funcDefs), []), **kwargs)
+		reader.read()
+		return reader
+
+	def findClassWithMethod0(self, reader):
+		for sectionName, classes in sorted(reader.classDataBySection.iteritems()):
+			for className, members in sorted(classes.iteritems()):
+				if members.get('Method0'):
+					return sectionName, className
+		self.fail('no class with Method0')
+
+	def getParamTypes(self, reader, sectionName, className):
+		funcDefs = reader.classDataBySection[sectionName][className]['Method0']
+		self.assertTrue(funcDefs)
+		return set(funcDef.params[0].type if funcDef.params else None for funcDef in funcDefs)
+
+	def testUnchanged(self):
+		first = self.crawl()
+		self.assertEqual(len(first.classesParsed), NUM_CLASSES)
+		second = self.crawl()
+		self.assertEqual(second.classesParsed, [])
+		self.assertEqual(second.classDataBySection.keys(), first.classDataBySection.keys())
+		for sectionName, classes in first.classDataBySection.iteritems():
+			self.assertEqual(sorted(second.classDataBySection[sectionName]), sorted(classes))
+
+	def testChangedPage(self):
+		first = self.crawl()
+		_sectionName, className = self.findClassWithMethod0(first)
+		filename = os.path.join(self.docsDir, 'ScriptReference', className + '.Method0.html')
+		with open(filename, 'ab') as f:
+			f.write('\n')
+		second = self.crawl()
+		self.assertEqual(second.classesParsed, [className])
+
+	def testMissingPage(self):
+		first = self.crawl()
+		sectionName, className = self.findClassWithMethod0(first)
+		filename = os.path.join(self.docsDir, 'ScriptReference', className + '.html')
+		os.rename(filename, filename + '.moved')
+		try:
+			second = self.crawl()
+			self.assertEqual(second.classesParsed, [className])
+			self.assertEqual(second.classDataBySection[sectionName][className], {})
+		finally:
+			os.rename(filename + '.moved', filename)
+		# read again once the page is back
+		self.assertEqual(self.crawl().classesParsed, [className])
+
+	def testOtherVersion(self):
+		self.crawl()
+		manifest = pickle.load(open(self.manifestFilename, 'rb'))
+		self.assertEqual(manifest['version'], Manifest.VERSION)
+		self.assertEqual(len(manifest['classes']), NUM_CLASSES)
+		# a manifest of another version is ignored, so every class is read
+		manifest['version'] = Manifest.VERSION - 1
+		pickle.dump(manifest, open(self.manifestFilename, 'wb'))
+		self.assertEqual(len(self.crawl().classesParsed), NUM_CLASSES)
+
+	def testFixupChanged(self):
+		first = self.crawl()
+		sectionName, className = self.findClassWithMethod0(first)
+		funcDefs = [{'class': className, 'function': 'Method0', 'funcDef': FIXED_FUNC_DEF}]
+		second = self.crawl(funcDefs)
+		# the class is read again and the fix-up applied
+		self.assertEqual(second.classesParsed, [className])
+		self.assertEqual(self.getParamTypes(second, sectionName, className), set(['Fixed']))
+		# and again when the fix-up is removed
+		third = self.crawl()
+		self.assertEqual(third.classesParsed, [className])
+		self.assertEqual(self.getParamTypes(third, sectionName, className), self.getParamTypes(first, sectionName, className))
+
+	def testFixupOfReusedClass(self):
+		_sectionName, className = self.findClassWithMethod0(self.crawl())
+		funcDefs = [
+			{'class': className, 'function': 'Method0', 'funcDef': FIXED_FUNC_DEF},
+			{'class': className, 'function': 'NoSuchMethod', 'funcDef': 'NoSuchMethod()'}
+		]
+		self.crawl(funcDefs)
+		stats.reset()
+		reader = self.crawl(funcDefs)
+		self.assertEqual(reader.classesParsed, [])
+		# the reused class's matched fix-up is not reported, the unmatched one still is
+		self.assertEqual(list(reader.fixups.iterUnmatched(reader.classesRead)), ['definition of {}.NoSuchMethod'.format(className)])
+		self.assertEqual(stats.counters['fixups.unmatched'], 1)
+
+	def testResumedClasses(self):
+		streamFilename = os.path.join(self.tempDir, 'test.jsonl')
+		self.crawl(streamFilename=streamFilename)
+		# an interrupted crawl wrote some classes, and no manifest
+		os.remove(self.manifestFilename)
+		with open(streamFilename, 'rb') as f:
+			lines = f.readlines()
+		with open(streamFilename, 'wb') as f:
+			f.writelines(lines[:5])
+		resumed = self.crawl(streamFilename=streamFilename, resume=True)
+		self.assertEqual(len(resumed.classesParsed), NUM_CLASSES - 5)
+		# the classes written before are recorded in the manifest too
+		reader = self.crawl()
+		self.assertEqual(reader.classesParsed, [])
+		for sectionName, classes in resumed.classDataBySection.iteritems():
+			for className, members in classes.iteritems():
+				self.assertEqual(ScriptReferenceReader.canonicalize(reader.classDataBySection[sectionName][className]),
+					ScriptReferenceReader.canonicalize(members))
+
+if __name__ == '__main__':
+	unittest.main()
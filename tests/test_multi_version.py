@@ -0,0 +1,106 @@
+"""Tests of the multi-version dataset: storage of each version's data, and diffs between versions."""
+import os
+import re
+import sys
+import glob
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+from multi_version import VersionedDataset, formatDiff
+from crawl import ScriptReferenceReader, crawlVersions
+from gen_synthetic_docs import SyntheticDocs
+
+def funcDef(*paramTypes):
+	return {'template': None, 'params': [{'name': 'p{}'.format(i), 'type': type_, 'default': None} for i, type_ in enumerate(paramTypes)], 'returnType': ';'}
+
+VERSION_A = {
+	'Runtime Classes': {
+		'Transform': {'position': None, 'Rotate': [funcDef('Vector3')], 'Find': [funcDef('string')]},
+		'Removed': {'Update': [funcDef()]}
+	}
+}
+VERSION_B = {
+	'Runtime Classes': {
+		'Transform': {'position': None, 'Rotate': [funcDef('Vector3'), funcDef('float', 'float', 'float')], 'GetChild': [funcDef('int')]},
+		'Added': {'Start': [funcDef()]}
+	}
+}
+
+class VersionedDatasetTest(unittest.TestCase):
+	def setUp(self):
+		self.tempDir = tempfile.mkdtemp(prefix='unity-versions-test-')
+		self.dataset = VersionedDataset()
+		self.dataset.add('A', VERSION_A)
+		self.dataset.add('B', VERSION_B)
+
+	def tearDown(self):
+		shutil.rmtree(self.tempDir)
+
+	def testDiff(self):
+		self.assertEqual(self.dataset.diff('A', 'B'), {
+			'added': [('Runtime Classes', 'Added', None), ('Runtime Classes', 'Transform', 'GetChild')],
+			'removed': [('Runtime Classes', 'Removed', None), ('Runtime Classes', 'Transform', 'Find')],
+			'changed': [('Runtime Classes', 'Transform', 'Rotate')]
+		})
+		self.assertEqual(self.dataset.diff('B', 'A')['added'], [('Runtime Classes', 'Removed', None), ('Runtime Classes', 'Transform', 'Find')])
+		self.assertEqual(self.dataset.diff('A', 'A'), {'added': [], 'removed': [], 'changed': []})
+		self.assertEqual(formatDiff(self.dataset.diff('A', 'B')).split('\n'), [
+			'+ Runtime Classes: Added', '+ Runtime Classes: Transform.GetChild',
+			'- Runtime Classes: Removed', '- Runtime Classes: Transform.Find',
+			'~ Runtime Classes: Transform.Rotate'])
+
+	def testUnknownVersion(self):
+		self.assertRaises(Exception, self.dataset.diff, 'A', 'C')
+		self.assertRaises(Exception, self.dataset.add, 'A', VERSION_A)
+
+	def testSaveLoad(self):
+		filename = os.path.join(self.tempDir, 'versions.pkl')
+		self.dataset.save(filename)
+		dataset = VersionedDataset.load(filename)
+		self.assertEqual(dataset.versions, ['A', 'B'])
+		self.assertEqual(dataset.getVersion('A'), VERSION_A)
+		self.assertEqual(dataset.getVersion('B'), VERSION_B)
+		self.assertEqual(dataset.diff('A', 'B'), self.dataset.diff('A', 'B'))
+
+class CrawlVersionsTest(unittest.TestCase):
+	def setUp(self):
+		self.tempDir = tempfile.mkdtemp(prefix='unity-versions-test-')
+		self.dirA = os.path.join(self.tempDir, 'a')
+		SyntheticDocs(self.dirA, numClasses=10, seed=7).generate()
+		self.dirB = os.path.join(self.tempDir, 'b')
+		shutil.copytree(self.dirA, self.dirB)
+
+	def tearDown(self):
+		shutil.rmtree(self.tempDir)
+
+	def changeParamType(self):
+		# changes the type of the first parameter of a method in version B, returns the class and method
+		for filename in sorted(glob.glob(os.path.join(self.dirB, 'ScriptReference', 'Class*.Method*.html'))):
+			with open(filename, 'rb') as f:
+				data = f.read()
+			data, count = re.subn(r'(<span class="sig-kw">\w+</span>\()\w+ param0', r'\1Changed param0', data)
+			if count:
+				with open(filename, 'wb') as f:
+					f.write(data)
+				return os.path.basename(filename).split('.')[:2]
+		self.fail('no method with parameters')
+
+	def testCrawl(self):
+		className, methodName = self.changeParamType()
+		filename = os.path.join(self.tempDir, 'versions.pkl')
+		crawlVersions([('A', self.dirA), ('B', self.dirB)], filename, workers=1)
+		dataset = VersionedDataset.load(filename)
+		diff = dataset.diff('A', 'B')
+		self.assertEqual([(c, m) for _s, c, m in diff['changed']], [(className, methodName)])
+		self.assertEqual((diff['added'], diff['removed']), ([], []))
+		# each version's data is that of a single-version crawl
+		reader = ScriptReferenceReader(baseDir=self.dirB)
+		reader.read()
+		self.assertEqual(dataset.getVersion('B'), reader.canonicalize(reader.classDataBySection))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,28 @@
+"""Tests of the pickle's function definition records."""
+import os
+import sys
+import unittest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from crawl import ScriptReferenceReader
+from func_model import FuncDef, Param
+
+def makeClassData():
+	# an inherited message, documented identically in two classes
+	return {'Classes': dict((className, {'Awake': [FuncDef(None, [Param('value', 'int', None)], ';')]}) for className in ('A', 'B'))}
+
+class CanonicalizeTest(unittest.TestCase):
+	def testRecordsNotShared(self):
+		data = ScriptReferenceReader.canonicalize(makeClassData())
+		a, b = data['Classes']['A']['Awake'][0], data['Classes']['B']['Awake'][0]
+		self.assertEqual(a, b)
+		a['params'][0]['name'] = 'changed'
+		self.assertEqual(b['params'][0]['name'], 'value')
+
+	def testRecordsShared(self):
+		data = ScriptReferenceReader.canonicalize(makeClassData(), records={})
+		self.assertIs(data['Classes']['A']['Awake'][0], data['Classes']['B']['Awake'][0])
+
+if __name__ == '__main__':
+	unittest.main()
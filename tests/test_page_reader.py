@@ -0,0 +1,152 @@
+"""Tests of page_reader: the content section parsed from a fragment must be the one found in the whole page."""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from lxml import etree
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from page_reader import readContent, extractContent, parseContent, PageContent, PAGE_PARSER, CONTENT_SECTION_XPATH
+
+# layout of a Unity 2019 Scripting API page, with the footer inside the content div
+UNITY_PAGE = '''<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en" class="no-js">
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=utf-8">
+<title>Unity - Scripting API: Transform.Rotate</title>
+<link rel="shortcut icon" href="../StaticFilesManual/images/favicons/favicon.ico">
+<script type="text/javascript" src="../StaticFiles/js/jquery.js"></script>
+<script type="text/javascript">
+	var pageData = {"title": "Transform.Rotate", "markup": "<div class=\\"content\\"><div class=\\"section\\">"};
+</script>
+<link rel="stylesheet" type="text/css" href="../StaticFiles/css/core.css">
+</head>
+<body>
+<div class="header-wrapper"><div id="header" class="header"><div class="content"><div class="spacer"><div class="menu">
+<div id="nav-open" for="nav-input"></div><div class="logo"><a href="./index.html"></a></div>
+<div class="search-form"><form action="30_search.html" method="get" class="apisearch">
+<input type="text" name="q" placeholder="Search scripting..." autosuggest="true" class="sbox field" id="q"><input type="submit" class="submit"></form></div>
+<ul><li><a href="../Manual/index.html">Manual</a></li><li><a href="./index.html" class="selected">Scripting API</a></li></ul>
+</div></div><div class="more"><div class="filler"></div><ul><li><a href="https://unity3d.com/">unity3d.com</a></li></ul></div></div></div></div>
+<div id="master-wrapper" class="master-wrapper clear">
+<div id="sidebar" class="sidebar"><div class="sidebar-wrap"><div class="content"><div class="sidebar-menu"><div class="toc"><h2>Scripting API</h2></div></div>
+<p><a href="40_history.html" class="cw">Version History</a></p></div></div></div>
+<div id="content-wrap" class="content-wrap opened-sidebar"><div class="content-block"><div class="content">
+<div class="section">
+<div class="mb20 clear"><h1 class="heading inherit"><a href="Transform.html">Transform</a>.Rotate</h1><div class="clear"></div>
+<div class="suggest"><a class="blue-btn sbtn">Suggest a change</a><div class="suggest-wrap rel hide">
+<div class="suggest-form clear"><label for="suggest_name">Your name</label><input id="suggest_name" type="text">
+<textarea id="suggest_body" class="req"></textarea><button class="blue-btn mr10">Submit suggestion</button></div></div></div>
+<div class="clear"></div></div>
+<div class="subsection"><div class="signature"><div class="signature-CS sig-block">public void <span class="sig-kw">Rotate</span>(<a href="Vector3.html">Vector3</a> <span class="sig-kw">eulers</span>,
+<a href="Space.html">Space</a> <span class="sig-kw">relativeTo</span> = Space.Self);</div></div></div>
+<div class="subsection"><h2>Parameters</h2><table class="list"><tr><td class="name lbl">eulers</td><td class="desc">The rotation to apply.</td></tr>
+<tr><td class="name lbl">relativeTo</td><td class="desc">Determines whether to rotate locally or relative to the world.</td></tr></table></div>
+<div class="subsection"><h2>Description</h2><p>Applies a rotation of <code>eulerAngles.z</code> degrees around the z-axis.</p></div>
+<div class="subsection"><pre class="codeExampleCS">using UnityEngine;
+// markup in examples is escaped: &lt;/div&gt;&lt;div class="footer-wrapper"&gt;
+public class Example : MonoBehaviour
+{
+    void Update()
+    {
+        transform.Rotate(0, Time.deltaTime * 30, 0, Space.World);
+    }
+}
+</pre></div>
+</div>
+<div class="footer-wrapper"><div class="footer clear"><div class="copy">Copyright &copy; 2019 Unity Technologies. Publication: 2019.1</div>
+<div class="menu"><a href="https://unity3d.com/legal">Legal</a></div></div></div>
+</div></div></div>
+</div>
+<script type="text/javascript">$(document).ready(function() { initMenu(); });</script>
+</body>
+</html>
+'''
+
+SECTION_START = '<div class="content">\n<div class="section">'
+
+def parseWholePage(data):
+	root = etree.fromstring(data, PAGE_PARSER)
+	sections = CONTENT_SECTION_XPATH(root)
+	return sections[0] if sections else root
+
+class PageReaderTest(unittest.TestCase):
+	def assertSameContent(self, data, fragment):
+		content = extractContent(data)
+		self.assertEqual(content.start is not None, fragment)
+		expected = etree.tostring(parseWholePage(data), with_tail=False)
+		self.assertEqual(etree.tostring(parseContent(content), with_tail=False), expected)
+
+	def replaceSectionStart(self, replacement):
+		self.assertIn(SECTION_START, UNITY_PAGE)
+		return UNITY_PAGE.replace(SECTION_START, replacement)
+
+	def testUnityPage(self):
+		self.assertSameContent(UNITY_PAGE, fragment=True)
+
+	def testSyntheticPages(self):
+		sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+		from gen_synthetic_docs import PAGE_TEMPLATE
+		self.assertSameContent(PAGE_TEMPLATE.format(title='Class0', nav='', content='<h1>Class0</h1>'), fragment=True)
+
+	def testEarlierSection(self):
+		# the XPath finds the first section directly inside a content div, here in the sidebar
+		data = UNITY_PAGE.replace('<div class="sidebar-menu">', '<div class="section">Sidebar</div><div class="sidebar-menu">')
+		self.assertSameContent(data, fragment=True)
+		data = UNITY_PAGE.replace('<div class="sidebar-menu">', '<div id="toc" class="section">Sidebar</div><div class="sidebar-menu">')
+		self.assertSameContent(data, fragment=False)
+		# one outside a content div is not found by the XPath either
+		data = UNITY_PAGE.replace('<div class="spacer">', '<div class="spacer"><div class="section">Header</div>')
+		self.assertSameContent(data, fragment=False)
+
+	def testAttributeOrder(self):
+		self.assertSameContent(self.replaceSectionStart('<div class="content">\n<div id="main" class="section">'), fragment=False)
+		self.assertSameContent(self.replaceSectionStart('<div class="content">\n<div class=section>'), fragment=False)
+		self.assertSameContent(self.replaceSectionStart('<div id="main" class="content">\n<div class="section">'), fragment=False)
+
+	def testExtraClass(self):
+		# not the section for the XPath, so the whole page is returned
+		self.assertSameContent(self.replaceSectionStart('<div class="content">\n<div class="section api">'), fragment=False)
+		self.assertSameContent(self.replaceSectionStart('<div class="content main">\n<div class="section">'), fragment=False)
+
+	def testElementBeforeSection(self):
+		self.assertSameContent(self.replaceSectionStart('<div class="content"><a name="top"></a>\n<div class="section">'), fragment=False)
+
+	def testSectionInComment(self):
+		data = UNITY_PAGE.replace('<div class="spacer">', '<!-- <div class="content"><div class="section"> --><div class="spacer">')
+		self.assertSameContent(data, fragment=False)
+		data = UNITY_PAGE.replace('</head>', '<script>document.write(\'<div class="content"><div class="section">\');</script></head>')
+		self.assertSameContent(data, fragment=False)
+
+	def testFooterMarkupInSection(self):
+		# the fragment is not cut at the footer, so the section keeps all of its content
+		data = UNITY_PAGE.replace('<div class="subsection"><h2>Description</h2>',
+			'<div class="footer-wrapper">Inline</div><div class="subsection"><h2>Description</h2>')
+		self.assertSameContent(data, fragment=True)
+		self.assertIn('Description', etree.tostring(parseContent(extractContent(data))))
+
+	def testFragmentMismatch(self):
+		# a fragment that does not parse to the section falls back to the whole page
+		data = UNITY_PAGE
+		content = PageContent(data, data.index('<div class="subsection">'))
+		self.assertEqual(etree.tostring(parseContent(content), with_tail=False), etree.tostring(parseWholePage(data), with_tail=False))
+
+	def testNoSection(self):
+		data = '<html><body><p>Not found</p></body></html>'
+		self.assertSameContent(data, fragment=False)
+		self.assertEqual(parseContent(extractContent(data)).tag, 'html')
+
+	def testReadContent(self):
+		tempDir = tempfile.mkdtemp(prefix='unity-page-test-')
+		try:
+			filename = os.path.join(tempDir, 'Transform.Rotate.html')
+			with open(filename, 'wb') as f:
+				f.write(UNITY_PAGE)
+			self.assertEqual(readContent(filename).start, UNITY_PAGE.index('<div class="section">\n<div class="mb20'))
+		finally:
+			shutil.rmtree(tempDir)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,35 @@
+"""Tests of the return types in the pickle, the search index and the completion table."""
+import os
+import sys
+import unittest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from crawl import ScriptReferenceReader
+from search_index import getReturnType
+
+class ReturnTypeTest(unittest.TestCase):
+	def parse(self, funcDef, funcName):
+		funcDef = ScriptReferenceReader.parseFuncDef(funcDef, funcName)
+		return funcDef.toDict(), funcDef.declaredType
+
+	def testCSharpSignature(self):
+		funcDef, declaredType = self.parse('public static GameObject[] FindGameObjectsWithTag(string tag);', 'FindGameObjectsWithTag')
+		# the pickle keeps the signature's ending, as read by the editor plugins
+		self.assertEqual(funcDef['returnType'], ';')
+		self.assertEqual(declaredType, 'GameObject[]')
+		self.assertEqual(getReturnType(funcDef, declaredType), 'GameObject[]')
+
+	def testConstructor(self):
+		funcDef, declaredType = self.parse('public Vector3(float x, float y, float z);', 'Vector3')
+		self.assertEqual(funcDef['returnType'], ';')
+		self.assertIsNone(getReturnType(funcDef, declaredType))
+
+	def testTrailingReturnType(self):
+		funcDef, declaredType = self.parse('Find(string) : GameObject', 'Find')
+		self.assertEqual(funcDef['returnType'], 'GameObject')
+		self.assertIsNone(declaredType)
+		self.assertEqual(getReturnType(funcDef, declaredType), 'GameObject')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,91 @@
+"""Tests of WebCache: entries, least recently used eviction, revalidation and migration of the legacy flat cache."""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+from web_cache import WebCache, EVICTION_TARGET
+from web_getter import WebGetter
+
+PAGE_SIZE = 1000
+
+def makePage():
+	# incompressible, so that the bodies' size is predictable
+	return os.urandom(PAGE_SIZE)
+
+class WebCacheTest(unittest.TestCase):
+	def setUp(self):
+		self.tempDir = tempfile.mkdtemp(prefix='unity-web-cache-test-')
+		self.dirname = os.path.join(self.tempDir, 'webcache')
+
+	def tearDown(self):
+		shutil.rmtree(self.tempDir)
+
+	def url(self, i):
+		return 'https://docs.unity3d.com/ScriptReference/Class{}.html'.format(i)
+
+	def setAccessTime(self, cache, url, accessTime):
+		os.utime(cache.getBasename(cache.getKey(url)) + cache.META_EXTENSION, (accessTime, accessTime))
+
+	def testReadWrite(self):
+		cache = WebCache(self.dirname)
+		self.assertIsNone(cache.read(self.url(0)))
+		cache.write(self.url(0), 'page', etag='"a"', lastModified='Mon, 01 Jul 2019 00:00:00 GMT')
+		entry = WebCache(self.dirname).read(self.url(0))
+		self.assertEqual(entry.data, 'page')
+		self.assertEqual(entry.meta['url'], self.url(0))
+		self.assertLess(entry.age, 60)
+		# no temporary files are left
+		self.assertEqual([filename for _dirpath, _dirnames, filenames in os.walk(self.dirname) for filename in filenames if filename.endswith('.tmp')], [])
+
+	def testEviction(self):
+		pages = [makePage() for _i in xrange(10)]
+		cache = WebCache(self.dirname)
+		for i, page in enumerate(pages):
+			cache.write(self.url(i), page)
+		bodySize = cache.totalSize / len(pages)
+		# oldest first, except that page 0 was read last
+		now = time.time()
+		for i in xrange(len(pages)):
+			self.setAccessTime(cache, self.url(i), now - 100 + i)
+		# a new cache instance scans the access times from disk
+		cache = WebCache(self.dirname, maxSize=bodySize * 10)
+		cache.read(self.url(0))
+		cache.write(self.url(10), makePage())
+		# evicted down to the target size, least recently used first
+		self.assertLessEqual(cache.totalSize, bodySize * 10 * EVICTION_TARGET + bodySize)
+		self.assertEqual([i for i in xrange(11) if cache.read(self.url(i)) is not None], [0] + range(3, 11))
+		self.assertEqual(cache.totalSize, sum(size for _lastAccess, size in cache.index.itervalues()))
+
+	def testRevalidation(self):
+		cache = WebCache(self.dirname)
+		cache.write(self.url(0), 'page', etag='"a"', lastModified='Mon, 01 Jul 2019 00:00:00 GMT')
+		entry = cache.read(self.url(0))
+		self.assertEqual(entry.getValidators(), {'If-None-Match': '"a"', 'If-Modified-Since': 'Mon, 01 Jul 2019 00:00:00 GMT'})
+		entry.meta['fetchTime'] -= 3600
+		cache.revalidated(entry)
+		entry = cache.read(self.url(0))
+		self.assertLess(entry.age, 60)
+		self.assertEqual(entry.data, 'page')
+		self.assertEqual(entry.meta['etag'], '"a"')
+		cache.write(self.url(1), 'page')
+		self.assertEqual(cache.read(self.url(1)).getValidators(), {})
+
+	def testLegacyMigration(self):
+		getter = WebGetter(dirname=self.dirname)
+		url = self.url(0)
+		legacyFilename = os.path.join(self.dirname, WebGetter.slugify(url))
+		with open(legacyFilename, 'wb') as f:
+			f.write('legacy page')
+		self.assertEqual(getter.readCache(url), 'legacy page')
+		# moved into the cache
+		self.assertFalse(os.path.exists(legacyFilename))
+		self.assertEqual(WebCache(self.dirname).read(url).data, 'legacy page')
+		self.assertIsNone(getter.readCache(self.url(1)))
+
+if __name__ == '__main__':
+	unittest.main()
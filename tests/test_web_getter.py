@@ -0,0 +1,188 @@
+"""Tests of WebGetter against a local HTTP/1.1 server: ordering, keep-alive, retries and revalidation."""
+import os
+import sys
+import time
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import BaseHTTPServer
+import SocketServer
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT_DIR)
+import web_getter
+from web_getter import WebGetter, HttpError
+
+ETAG = '"v1"'
+SLOW_DELAY = 1.0
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+	# keeps connections open between requests
+	protocol_version = 'HTTP/1.1'
+
+	def do_GET(self):
+		server = self.server
+		with server.lock:
+			server.requests.append((self.path, self.client_address, dict(self.headers)))
+			attempt = sum(1 for path, _address, _headers in server.requests if path == self.path)
+		if self.path.startswith('/page/'):
+			self.respond(200, 'data of ' + self.path)
+		elif self.path == '/flaky':
+			if attempt <= 2:
+				self.respond(503, 'unavailable')
+			else:
+				self.respond(200, 'recovered')
+		elif self.path == '/slow':
+			if attempt == 1:
+				time.sleep(SLOW_DELAY)
+			self.respond(200, 'slow')
+		elif self.path == '/etag':
+			if self.headers.get('If-None-Match') == ETAG:
+				self.respond(304, '')
+			else:
+				self.respond(200, 'tagged', {'ETag': ETAG})
+		else:
+			self.respond(404, 'not found')
+
+	def respond(self, status, body, headers={}):
+		try:
+			self.send_response(status)
+			for name, value in headers.iteritems():
+				self.send_header(name, value)
+			self.send_header('Content-Length', str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+		except socket.error:
+			# the client gave up waiting
+			self.close_connection = 1
+
+	def log_message(self, format, *args):
+		pass
+
+class Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+	daemon_threads = True
+
+	def __init__(self):
+		BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), Handler)
+		self.lock = threading.Lock()
+		# (path, client address, headers) of each request
+		self.requests = []
+
+class RecordingRandom(object):
+	# stands in for the random module in web_getter: records the retry delay ranges, and does not wait
+	def __init__(self):
+		self.ranges = []
+
+	def uniform(self, a, b):
+		self.ranges.append((a, b))
+		return 0
+
+class WebGetterTest(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.server = Server()
+		cls.serverThread = threading.Thread(target=cls.server.serve_forever)
+		cls.serverThread.daemon = True
+		cls.serverThread.start()
+		cls.baseUrl = 'http://127.0.0.1:{}'.format(cls.server.server_address[1])
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		cls.server.server_close()
+
+	def setUp(self):
+		self.server.requests = []
+		self.random = RecordingRandom()
+		self.originalRandom = web_getter.random
+		web_getter.random = self.random
+		self.tempDir = tempfile.mkdtemp(prefix='unity-web-getter-test-')
+		self.getters = []
+
+	def tearDown(self):
+		web_getter.random = self.originalRandom
+		for getter in self.getters:
+			getter.close()
+		shutil.rmtree(self.tempDir)
+
+	def makeGetter(self, **kwargs):
+		kwargs.setdefault('enableCache', False)
+		getter = WebGetter(dirname=os.path.join(self.tempDir, 'webcache'), **kwargs)
+		self.getters.append(getter)
+		return getter
+
+	def url(self, path):
+		return self.baseUrl + path
+
+	def getRequests(self, path):
+		return [request for request in self.server.requests if request[0] == path]
+
+	def testOrder(self):
+		paths = ['/page/{}'.format(i) for i in (3, 1, 4, 1, 5, 9, 2, 6)]
+		results = self.makeGetter().getMany([self.url(path) for path in paths], concurrency=4)
+		self.assertEqual(results, ['data of ' + path for path in paths])
+		# each URL is requested once
+		self.assertEqual(len(self.server.requests), len(set(paths)))
+
+	def testKeepAlive(self):
+		getter = self.makeGetter()
+		for i in xrange(5):
+			self.assertEqual(getter.getUrl(self.url('/page/{}'.format(i))), 'data of /page/{}'.format(i))
+		self.assertEqual(len(set(address for _path, address, _headers in self.server.requests)), 1)
+
+	def testKeepAliveConcurrent(self):
+		paths = ['/page/{}'.format(i) for i in xrange(20)]
+		self.makeGetter().getMany([self.url(path) for path in paths], concurrency=2)
+		self.assertLessEqual(len(set(address for _path, address, _headers in self.server.requests)), 2)
+
+	def testRetryServerError(self):
+		getter = self.makeGetter(baseDelay=0.5, timeoutFactor=2, maxDelay=1.5)
+		self.assertEqual(getter.getUrl(self.url('/flaky')), 'recovered')
+		self.assertEqual(len(self.getRequests('/flaky')), 3)
+		# a random delay up to the exponentially growing limit before each retry
+		self.assertEqual(self.random.ranges, [(0, 0.5), (0, 1.0)])
+
+	def testRetryTimeout(self):
+		getter = self.makeGetter(baseTimeout=0.2, timeoutFactor=2, baseDelay=0.5)
+		self.assertEqual(getter.getUrl(self.url('/slow')), 'slow')
+		self.assertEqual(len(self.getRequests('/slow')), 2)
+		self.assertEqual(self.random.ranges, [(0, 0.5)])
+
+	def testRetryLimit(self):
+		getter = self.makeGetter(numRetries=2, baseDelay=0.5)
+		with self.assertRaises(HttpError) as context:
+			getter.getUrl(self.url('/flaky'))
+		self.assertEqual(context.exception.status, 503)
+		self.assertEqual(len(self.getRequests('/flaky')), 2)
+
+	def testNoRetryNotFound(self):
+		getter = self.makeGetter()
+		with self.assertRaises(HttpError) as context:
+			getter.getMany([self.url('/page/1'), self.url('/missing')])
+		self.assertEqual(context.exception.status, 404)
+		self.assertEqual(len(self.getRequests('/missing')), 1)
+		self.assertEqual(self.random.ranges, [])
+
+	def testRevalidation(self):
+		getter = self.makeGetter(enableCache=True, maxAge=0)
+		self.assertEqual(getter.getUrl(self.url('/etag')), 'tagged')
+		fetchTime = getter.cache.read(self.url('/etag')).meta['fetchTime']
+		time.sleep(0.01)
+		self.assertEqual(getter.getUrl(self.url('/etag')), 'tagged')
+		requests = self.getRequests('/etag')
+		self.assertEqual(len(requests), 2)
+		self.assertNotIn('if-none-match', requests[0][2])
+		self.assertEqual(requests[1][2].get('if-none-match'), ETAG)
+		# the entry counts as fetched again
+		self.assertGreater(getter.cache.read(self.url('/etag')).meta['fetchTime'], fetchTime)
+
+	def testFreshCacheEntry(self):
+		getter = self.makeGetter(enableCache=True)
+		self.assertEqual(getter.getUrl(self.url('/etag')), 'tagged')
+		self.assertEqual(getter.getUrl(self.url('/etag')), 'tagged')
+		self.assertEqual(len(self.getRequests('/etag')), 1)
+
+if __name__ == '__main__':
+	unittest.main()
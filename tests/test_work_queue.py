@@ -0,0 +1,85 @@
+"""Tests of crawls distributed with --coordinator and --worker, run on a small synthetic documentation tree."""
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'benchmarks'))
+from gen_synthetic_docs import SyntheticDocs
+
+CRAWL_SCRIPT = os.path.join(os.path.abspath(ROOT_DIR), 'crawl.py')
+NUM_CLASSES = 5
+TIMEOUT = 60
+
+class CoordinatorTest(unittest.TestCase):
+	def setUp(self):
+		self.tempDir = tempfile.mkdtemp(prefix='unity-queue-test-')
+		self.docsDir = os.path.join(self.tempDir, 'docs')
+		SyntheticDocs(self.docsDir, numClasses=NUM_CLASSES).generate()
+		self.queueFilename = os.path.join(self.tempDir, 'queue.db')
+		self.output = os.path.join(self.tempDir, 'unity.pkl')
+
+	def tearDown(self):
+		shutil.rmtree(self.tempDir)
+
+	def startCrawl(self, *args):
+		# run in the temporary directory, where the log is written
+		return subprocess.Popen([sys.executable, CRAWL_SCRIPT, '--base-dir', self.docsDir, '--quiet'] + list(args),
+			cwd=self.tempDir, stdout=open(os.devnull, 'w'), stderr=subprocess.STDOUT)
+
+	def waitFor(self, process):
+		# returns the exit code, or None if the process had to be killed
+		deadline = time.time() + TIMEOUT
+		while process.poll() is None:
+			if time.time() > deadline:
+				process.kill()
+				process.wait()
+				return None
+			time.sleep(0.1)
+		return process.returncode
+
+	def crawlWithWorker(self, *args):
+		coordinator = self.startCrawl('--coordinator', self.queueFilename, '--output', self.output, *args)
+		worker = self.startCrawl('--worker', self.queueFilename)
+		self.assertEqual(self.waitFor(coordinator), 0)
+		self.assertEqual(self.waitFor(worker), 0)
+
+	def testCrawl(self):
+		self.crawlWithWorker()
+		self.assertTrue(os.path.exists(self.output))
+
+	def testLogs(self):
+		self.crawlWithWorker()
+		# the worker, started in the same directory, must not have truncated the coordinator's log
+		with open(os.path.join(self.tempDir, 'crawl.log')) as f:
+			self.assertIn('publishing {} classes'.format(NUM_CLASSES), f.read())
+		workerLogs = glob.glob(os.path.join(self.tempDir, 'crawl-worker-*.log'))
+		self.assertEqual(len(workerLogs), 1)
+		with open(workerLogs[0]) as f:
+			self.assertIn('no classes left', f.read())
+
+	def testIncrementalWithoutChanges(self):
+		self.crawlWithWorker('--incremental')
+		# no class changed, so none is read, and workers must still see the crawl as finished
+		self.crawlWithWorker('--incremental')
+
+	def testIncrementalReport(self):
+		self.crawlWithWorker('--incremental')
+		with open(os.path.join(self.docsDir, 'ScriptReference', 'Class0.html'), 'ab') as f:
+			f.write('\n')
+		statsFilename = os.path.join(self.tempDir, 'stats.json')
+		self.crawlWithWorker('--incremental', '--stats-json', statsFilename)
+		# reported once the changed class is read, although the unchanged ones follow it
+		with open(os.path.join(self.tempDir, 'crawl.log')) as f:
+			self.assertIn('progress: 1/1 classes done', f.read())
+		with open(statsFilename) as f:
+			self.assertIn('queue.retries', json.load(f)['counters'])
+
+if __name__ == '__main__':
+	unittest.main()
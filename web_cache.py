@@ -0,0 +1,157 @@
+DEFAULT_MAX_SIZE = 1024 ** 3
+# fraction of the maximum size to evict down to, so that eviction does not run on every write
+EVICTION_TARGET = 0.9
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import threading
+
+class CacheEntry(object):
+	def __init__(self, data, meta):
+		self.data = data
+		self.meta = meta
+
+	@property
+	def age(self):
+		return time.time() - self.meta['fetchTime']
+
+	def getValidators(self):
+		headers = {}
+		if self.meta.get('etag'):
+			headers['If-None-Match'] = self.meta['etag']
+		if self.meta.get('lastModified'):
+			headers['If-Modified-Since'] = self.meta['lastModified']
+		return headers
+
+class WebCache(object):
+	"""On-disk cache of web pages, keyed by URL hash.
+
+	Each entry is a zlib-compressed body and a JSON metadata record (URL, ETag, Last-Modified, fetch time),
+	stored in two levels of subdirectories named after the hash prefix.
+	The modification time of the metadata file is the entry's last access time,
+	used to evict the least recently used entries when the total size of bodies exceeds maxSize.
+	"""
+
+	BODY_EXTENSION = '.z'
+	META_EXTENSION = '.json'
+
+	def __init__(self, dirname, maxSize=DEFAULT_MAX_SIZE):
+		self.dirname = dirname
+		self.maxSize = maxSize
+		self.lock = threading.Lock()
+		# key -> [last access time, body size], scanned from disk on first write
+		self.index = None
+		self.totalSize = 0
+		if not os.path.isdir(self.dirname):
+			os.makedirs(self.dirname)
+
+	@classmethod
+	def getKey(cls, url):
+		if isinstance(url, unicode):
+			url = url.encode('utf-8')
+		return hashlib.sha1(url).hexdigest()
+
+	def getBasename(self, key):
+		return os.path.join(self.dirname, key[:2], key[2:4], key)
+
+	def read(self, url):
+		basename = self.getBasename(self.getKey(url))
+		try:
+			meta = json.load(open(basename + self.META_EXTENSION, 'rb'))
+			data = zlib.decompress(open(basename + self.BODY_EXTENSION, 'rb').read())
+		except (IOError, ValueError, zlib.error):
+			return None
+		self.touch(url)
+		return CacheEntry(data, meta)
+
+	def touch(self, url):
+		key = self.getKey(url)
+		now = time.time()
+		try:
+			os.utime(self.getBasename(key) + self.META_EXTENSION, (now, now))
+		except OSError:
+			return
+		with self.lock:
+			if self.index is not None and key in self.index:
+				self.index[key][0] = now
+
+	def revalidated(self, entry):
+		entry.meta['fetchTime'] = time.time()
+		self.writeMeta(self.getBasename(self.getKey(entry.meta['url'])), entry.meta)
+
+	def write(self, url, data, etag=None, lastModified=None):
+		key = self.getKey(url)
+		basename = self.getBasename(key)
+		dirname = os.path.dirname(basename)
+		if not os.path.isdir(dirname):
+			try:
+				os.makedirs(dirname)
+			except OSError:
+				# created by another thread
+				pass
+		body = zlib.compress(data)
+		self.writeFile(basename + self.BODY_EXTENSION, body)
+		self.writeMeta(basename, {
+			'url': url,
+			'etag': etag,
+			'lastModified': lastModified,
+			'fetchTime': time.time(),
+			'size': len(data)
+		})
+		with self.lock:
+			self.loadIndex()
+			if key in self.index:
+				self.totalSize -= self.index[key][1]
+			self.index[key] = [time.time(), len(body)]
+			self.totalSize += len(body)
+			if self.totalSize > self.maxSize:
+				self.evict()
+
+	def writeMeta(self, basename, meta):
+		self.writeFile(basename + self.META_EXTENSION, json.dumps(meta))
+
+	@classmethod
+	def writeFile(cls, filename, data):
+		# write and rename, so that readers never see a partial file; the cache may be shared by several processes
+		tempFilename = '{}.{}.{}.tmp'.format(filename, os.getpid(), threading.current_thread().ident)
+		with open(tempFilename, 'wb') as f:
+			f.write(data)
+		if os.name == 'nt' and os.path.exists(filename):
+			os.remove(filename)
+		os.rename(tempFilename, filename)
+
+	def loadIndex(self):
+		if self.index is not None:
+			return
+		self.index = {}
+		self.totalSize = 0
+		for dirpath, _dirnames, filenames in os.walk(self.dirname):
+			for filename in filenames:
+				if not filename.endswith(self.META_EXTENSION):
+					continue
+				key = filename[:-len(self.META_EXTENSION)]
+				basename = os.path.join(dirpath, key)
+				try:
+					lastAccess = os.path.getmtime(basename + self.META_EXTENSION)
+					size = os.path.getsize(basename + self.BODY_EXTENSION)
+				except OSError:
+					continue
+				self.index[key] = [lastAccess, size]
+				self.totalSize += size
+
+	def evict(self):
+		targetSize = self.maxSize * EVICTION_TARGET
+		for key, (_lastAccess, size) in sorted(self.index.iteritems(), key=lambda item: item[1][0]):
+			if self.totalSize <= targetSize:
+				break
+			basename = self.getBasename(key)
+			for extension in (self.META_EXTENSION, self.BODY_EXTENSION):
+				try:
+					os.remove(basename + extension)
+				except OSError:
+					pass
+			del self.index[key]
+			self.totalSize -= size
@@ -2,63 +2,220 @@ DEFAULT_DIRNAME = 'webcache'
 DEFAULT_BASE_TIMEOUT = 5
 DEFAULT_TIMEOUT_FACTOR = 2
 DEFAULT_NUM_RETRIES = 10
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30
+DEFAULT_CONCURRENCY = 8
+MAX_REDIRECTS = 5
 
 import os
 import re
 import string
 import urllib2
+import urlparse
+import httplib
 import socket
+import random
+import time
+import threading
+import Queue
+from web_cache import WebCache, DEFAULT_MAX_SIZE
+
+class HttpError(Exception):
+	def __init__(self, url, status, reason):
+		Exception.__init__(self, 'HTTP error {} {}: {}'.format(status, reason, url))
+		self.url = url
+		self.status = status
+
+	@property
+	def retriable(self):
+		return self.status >= 500 or self.status in (408, 429)
+
+class ConnectionPool(object):
+	"""Keeps idle keep-alive connections per scheme, host and port, for reuse by any thread."""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.idle = {}
+
+	def acquire(self, scheme, netloc, timeout, reuse=True):
+		conn = None
+		if reuse:
+			with self.lock:
+				connections = self.idle.get((scheme, netloc))
+				conn = connections.pop() if connections else None
+		if conn is None:
+			connClass = httplib.HTTPSConnection if scheme == 'https' else httplib.HTTPConnection
+			return connClass(netloc, timeout=timeout), False
+		conn.timeout = timeout
+		if conn.sock:
+			conn.sock.settimeout(timeout)
+		return conn, True
+
+	def release(self, scheme, netloc, conn):
+		with self.lock:
+			self.idle.setdefault((scheme, netloc), []).append(conn)
+
+	def close(self):
+		with self.lock:
+			for connections in self.idle.itervalues():
+				for conn in connections:
+					conn.close()
+			self.idle = {}
 
 class WebGetter(object):
 	def __init__(self, enableCache=True, dirname=DEFAULT_DIRNAME,
-				baseTimeout=DEFAULT_BASE_TIMEOUT, timeoutFactor=DEFAULT_TIMEOUT_FACTOR, numRetries=DEFAULT_NUM_RETRIES):
+				baseTimeout=DEFAULT_BASE_TIMEOUT, timeoutFactor=DEFAULT_TIMEOUT_FACTOR, numRetries=DEFAULT_NUM_RETRIES,
+				baseDelay=DEFAULT_BASE_DELAY, maxDelay=DEFAULT_MAX_DELAY, concurrency=DEFAULT_CONCURRENCY,
+				maxCacheSize=DEFAULT_MAX_SIZE, maxAge=None):
 		self.enableCache = enableCache
 		self.dirname = dirname
 		self.baseTimeout = baseTimeout
 		self.timeoutFactor = timeoutFactor
 		self.numRetries = numRetries
+		self.baseDelay = baseDelay
+		self.maxDelay = maxDelay
+		self.concurrency = concurrency
+		# cached pages older than maxAge seconds are revalidated with the server, None means never
+		self.maxAge = maxAge
+		self.connectionPool = ConnectionPool()
 
-		if self.enableCache:
-			self.createCacheDir()
-
-	def createCacheDir(self):
-		if not os.path.isdir(self.dirname):
-			os.makedirs(self.dirname)
+		self.cache = WebCache(self.dirname, maxCacheSize) if self.enableCache else None
 
 	def getUrl(self, url):
+		entry = self.readCacheEntry(url) if self.enableCache else None
+		if entry and entry.data and (self.maxAge is None or entry.age < self.maxAge):
+			return entry.data
+		headers = entry.getValidators() if entry and entry.data else {}
+		status, data, responseHeaders = self.fetchWithRetries(url, headers)
+		if status == 304:
+			self.cache.revalidated(entry)
+			return entry.data
 		if self.enableCache:
-			data = self.readCache(url)
-			if data:
-				return data
+			self.cache.write(url, data, etag=responseHeaders.get('etag'), lastModified=responseHeaders.get('last-modified'))
+		return data
+
+	def getMany(self, urls, concurrency=None):
+		"""Gets URLs concurrently, returning their data in the same order.
+
+		Raises the first error encountered, after all other URLs have been handled.
+		"""
+		uniqueUrls = list(set(urls))
+		dataByUrl = {}
+		errors = []
+		queue = Queue.Queue()
+		for url in uniqueUrls:
+			queue.put(url)
+
+		def work():
+			while True:
+				try:
+					url = queue.get_nowait()
+				except Queue.Empty:
+					return
+				try:
+					dataByUrl[url] = self.getUrl(url)
+				except Exception, e:
+					errors.append(e)
+
+		numThreads = min(concurrency or self.concurrency, len(uniqueUrls))
+		threads = [threading.Thread(target=work) for _i in xrange(numThreads)]
+		for thread in threads:
+			thread.daemon = True
+			thread.start()
+		for thread in threads:
+			thread.join()
+		if errors:
+			raise errors[0]
+		return [dataByUrl[url] for url in urls]
+
+	def close(self):
+		self.connectionPool.close()
+
+	def fetchWithRetries(self, url, headers={}):
 		timeout = self.baseTimeout
-		for _i in xrange(self.numRetries):
+		for attempt in xrange(self.numRetries):
 			try:
-				data = urllib2.urlopen(url, timeout=timeout).read()
-				if self.enableCache:
-					self.writeCache(url, data)
-				return data
-			except (urllib2.URLError, socket.timeout), e:
-				# retry
-				timeout *= self.timeoutFactor
+				return self.fetch(url, timeout, headers)
+			except HttpError, e:
+				if not e.retriable:
+					break
+			except (urllib2.URLError, httplib.HTTPException, socket.error, socket.timeout), e:
+				pass
+			# retry, after a random delay ("full jitter") so that concurrent requests do not retry in lockstep
+			time.sleep(random.uniform(0, min(self.maxDelay, self.baseDelay * self.timeoutFactor ** attempt)))
+			timeout *= self.timeoutFactor
 		print 'Could not get URL:', url
 		raise e
 
-	def getCacheFilename(self, url):
-		return os.path.join(self.dirname, self.slugify(url))
+	def fetch(self, url, timeout, headers={}):
+		"""Returns status, data and headers (with lowercase names)."""
+		for _i in xrange(MAX_REDIRECTS + 1):
+			parsedUrl = urlparse.urlsplit(url)
+			if parsedUrl.scheme not in ('http', 'https'):
+				return 200, urllib2.urlopen(url, timeout=timeout).read(), {}
+			response, data = self.request(parsedUrl, timeout, headers)
+			if response.status in (301, 302, 303, 307, 308) and response.getheader('location'):
+				url = urlparse.urljoin(url, response.getheader('location'))
+				continue
+			if response.status == 304 and headers:
+				return response.status, None, dict(response.getheaders())
+			if response.status != 200:
+				raise HttpError(url, response.status, response.reason)
+			return response.status, data, dict(response.getheaders())
+		raise HttpError(url, response.status, 'Too many redirects')
 
-	def readCache(self, url):
-		filename = self.getCacheFilename(url)
+	def request(self, parsedUrl, timeout, headers):
+		path = urlparse.urlunsplit(('', '', parsedUrl.path or '/', parsedUrl.query, ''))
+		conn, reused = self.connectionPool.acquire(parsedUrl.scheme, parsedUrl.netloc, timeout)
+		try:
+			try:
+				conn.request('GET', path, headers=headers)
+				response = conn.getresponse()
+			except (httplib.HTTPException, socket.error):
+				if not reused:
+					raise
+				# the server may have closed the idle connection, try once more with a new one
+				conn.close()
+				conn, reused = self.connectionPool.acquire(parsedUrl.scheme, parsedUrl.netloc, timeout, reuse=False)
+				conn.request('GET', path, headers=headers)
+				response = conn.getresponse()
+			data = response.read()
+		except:
+			conn.close()
+			raise
+		if response.will_close:
+			conn.close()
+		else:
+			self.connectionPool.release(parsedUrl.scheme, parsedUrl.netloc, conn)
+		return response, data
+
+	def readCacheEntry(self, url):
+		entry = self.cache.read(url)
+		if entry is None:
+			entry = self.migrateLegacyCacheFile(url)
+		return entry
+
+	def migrateLegacyCacheFile(self, url):
+		# pages cached by previous versions, in a flat directory, named after the slugified URL
+		filename = self.getLegacyCacheFilename(url)
 		if not os.path.isfile(filename):
 			return None
-		return open(filename, 'rb').read()
+		self.cache.write(url, open(filename, 'rb').read())
+		os.remove(filename)
+		return self.cache.read(url)
+
+	def readCache(self, url):
+		entry = self.readCacheEntry(url)
+		return entry.data if entry else None
 
 	def writeCache(self, url, data):
-		filename = self.getCacheFilename(url)
-		return open(filename, 'wb').write(data)
+		self.cache.write(url, data)
+
+	def getLegacyCacheFilename(self, url):
+		return os.path.join(self.dirname, self.slugify(url))
 
 	VALID_CHARS = "-_.() %s%s" % (string.ascii_letters, string.digits)
 
 	@classmethod
 	def slugify(cls, value):
 		return re.sub('[^%s]' % cls.VALID_CHARS, '-', value)
-		
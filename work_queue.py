@@ -0,0 +1,141 @@
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+
+import time
+import pickle
+import sqlite3
+
+# item states
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+class WorkItem(object):
+	def __init__(self, itemId, token, attempts, task):
+		self.itemId = itemId
+		# identifies this claim of the item, so that a worker whose lease expired cannot complete it
+		self.token = token
+		self.attempts = attempts
+		self.task = task
+
+class WorkQueue(object):
+	"""A queue of tasks in an SQLite file, shared by a coordinator and any number of worker processes.
+
+	The coordinator publishes the tasks, each worker claims one task at a time and stores its result,
+	and the coordinator collects the results in task order.
+	A claimed task is leased to its worker for leaseSeconds: if the worker dies, the task is claimed again once the lease expires.
+	Failed tasks are retried until they have been attempted maxAttempts times.
+	Tasks and results are pickled. Workers on other hosts need the file on a filesystem with working locks.
+	"""
+
+	def __init__(self, filename, leaseSeconds=DEFAULT_LEASE_SECONDS):
+		self.filename = filename
+		self.leaseSeconds = leaseSeconds
+		# transactions are begun explicitly, see transaction()
+		self.connection = sqlite3.connect(filename, timeout=60, isolation_level=None)
+		self.connection.text_factory = str
+		with self.transaction():
+			self.connection.execute('CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, task BLOB, state TEXT, attempts INTEGER, '
+				'token INTEGER, worker TEXT, leaseExpires REAL, result BLOB, error TEXT)')
+			self.connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)')
+
+	def close(self):
+		self.connection.close()
+
+	def transaction(self):
+		return Transaction(self.connection)
+
+	def getMeta(self, key, default=None):
+		row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+		return row[0] if row else default
+
+	def setMeta(self, key, value):
+		self.connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+	def reset(self):
+		"""Removes the tasks of a previous crawl, so that workers wait for the next ones to be published."""
+		with self.transaction():
+			self.connection.execute('DELETE FROM items')
+			self.connection.execute('DELETE FROM meta')
+
+	def publish(self, tasks, maxAttempts=DEFAULT_MAX_ATTEMPTS):
+		"""Replaces the queue's tasks, numbered from 0 in the given order."""
+		with self.transaction():
+			self.connection.execute('DELETE FROM items')
+			self.connection.executemany('INSERT INTO items (id, task, state, attempts, token) VALUES (?, ?, ?, 0, 0)',
+				((itemId, buffer(pickle.dumps(task, pickle.HIGHEST_PROTOCOL)), PENDING) for itemId, task in enumerate(tasks)))
+			self.setMeta('maxAttempts', maxAttempts)
+			self.setMeta('published', 1)
+
+	def claim(self, worker):
+		"""Returns the next pending task, or a task whose lease expired, as a WorkItem; or None if there is none."""
+		with self.transaction():
+			while True:
+				now = time.time()
+				row = self.connection.execute('SELECT id, task, attempts, token FROM items WHERE state = ? OR (state = ? AND leaseExpires < ?) '
+					'ORDER BY id LIMIT 1', (PENDING, RUNNING, now)).fetchone()
+				if row is None:
+					return None
+				itemId, task, attempts, token = row
+				if attempts >= self.getMeta('maxAttempts'):
+					# the last attempt's worker died
+					self.connection.execute('UPDATE items SET state = ?, error = ? WHERE id = ?', (FAILED, 'lease expired', itemId))
+					continue
+				self.connection.execute('UPDATE items SET state = ?, attempts = ?, token = ?, worker = ?, leaseExpires = ? WHERE id = ?',
+					(RUNNING, attempts + 1, token + 1, worker, now + self.leaseSeconds, itemId))
+				return WorkItem(itemId, token + 1, attempts + 1, pickle.loads(str(task)))
+
+	def complete(self, item, result):
+		"""Stores the result of a claimed task; returns False if the task was claimed by another worker since."""
+		with self.transaction():
+			cursor = self.connection.execute('UPDATE items SET state = ?, result = ?, error = NULL WHERE id = ? AND token = ? AND state = ?',
+				(DONE, buffer(pickle.dumps(result, pickle.HIGHEST_PROTOCOL)), item.itemId, item.token, RUNNING))
+			return cursor.rowcount == 1
+
+	def fail(self, item, error):
+		"""Returns a claimed task to the queue to be retried, or marks it as failed after its last attempt."""
+		with self.transaction():
+			state = FAILED if item.attempts >= self.getMeta('maxAttempts') else PENDING
+			self.connection.execute('UPDATE items SET state = ?, error = ?, worker = NULL, leaseExpires = NULL WHERE id = ? AND token = ? AND state = ?',
+				(state, error, item.itemId, item.token, RUNNING))
+
+	def isFinished(self):
+		"""Returns whether tasks were published and none are left to claim, now or once a lease expires."""
+		if not self.getMeta('published'):
+			return False
+		return self.connection.execute('SELECT COUNT(*) FROM items WHERE state IN (?, ?)', (PENDING, RUNNING)).fetchone()[0] == 0
+
+	def getProgress(self):
+		"""Returns a dictionary of the number of tasks in each state, and of the times tasks were claimed again ("retries")."""
+		progress = dict((state, 0) for state in (PENDING, RUNNING, DONE, FAILED))
+		for state, count in self.connection.execute('SELECT state, COUNT(*) FROM items GROUP BY state'):
+			progress[state] = count
+		progress['retries'] = int(self.connection.execute('SELECT TOTAL(MAX(attempts - 1, 0)) FROM items').fetchone()[0])
+		return progress
+
+	def getFinished(self, startId):
+		"""Returns (item id, state, result, error, attempts) tuples of the done and failed tasks numbered from startId on,
+		up to the first task not finished yet.
+
+		Results are unpickled, and None for failed tasks.
+		"""
+		finished = []
+		rows = self.connection.execute('SELECT id, state, result, error, attempts FROM items WHERE id >= ? AND state IN (?, ?) ORDER BY id',
+			(startId, DONE, FAILED))
+		for itemId, state, result, error, attempts in rows:
+			if itemId != startId + len(finished):
+				break
+			finished.append((itemId, state, pickle.loads(str(result)) if result is not None else None, error, attempts))
+		return finished
+
+class Transaction(object):
+	# BEGIN IMMEDIATE takes the write lock up front, so that two workers cannot claim the same task
+	def __init__(self, connection):
+		self.connection = connection
+
+	def __enter__(self):
+		self.connection.execute('BEGIN IMMEDIATE')
+
+	def __exit__(self, excType, excValue, traceback):
+		self.connection.execute('COMMIT' if excType is None else 'ROLLBACK')